@@ -8,7 +8,7 @@ import numpy as np
 from mpl3d import glm
 from mpl3d.mesh import Mesh
 from mpl3d.camera import Camera
-import meshio
+from mpl3d.io import read_obj
 
 
 def subplot(index):
@@ -36,9 +36,7 @@ if __name__ == "__main__":
     fig = plt.figure(figsize=(8,8))
 
     # Model loading
-    mesh = meshio.read("data/bunny.obj")
-    vertices = mesh.points
-    faces = mesh.cells[0].data
+    vertices, faces = read_obj("data/bunny.obj")
     
     ax = subplot(221)
     ax.axis("off")
@@ -46,27 +44,35 @@ if __name__ == "__main__":
     mesh = Mesh(ax, camera.transform, vertices, faces, linewidths=.5,
                 cmap=plt.get_cmap("magma"), edgecolors=(0,0,0,0.25))
     camera.connect(ax, mesh.update)
+    camera.animate(mesh.collection)
 
-    ortho = glm.ortho(-1,+1,-1,+1, 1, 100) @ glm.scale(2)
+    # Orthographic views are linked to the camera (with fixed rotations)
+    ortho = glm.ortho(-1,+1,-1,+1, 1, 100)
+    view = glm.scale(2)
     
     ax = subplot(222)
-    camera = ortho @ glm.xrotate(90)
-    mesh = Mesh(ax, camera, vertices, faces,
+    mesh = Mesh(ax, camera.transform, vertices, faces,
                 facecolors=white,  edgecolors=black, linewidths=.25)
+    camera.link(ax, mesh.update, proj=ortho, view=view,
+                rotation=glm.xrotate(90))
+    camera.animate(mesh.collection)
     ax.text(.99, .99, "Orthographic (XZ)",
             transform=ax.transAxes, ha="right", va="top")
 
     ax = subplot(223)
-    camera = ortho @ glm.yrotate(90)
-    mesh = Mesh(ax, camera, vertices, faces,
+    mesh = Mesh(ax, camera.transform, vertices, faces,
                 facecolors=white,  edgecolors=black, linewidths=.25)
+    camera.link(ax, mesh.update, proj=ortho, view=view,
+                rotation=glm.yrotate(90))
+    camera.animate(mesh.collection)
     ax.text(.99, .99, "Orthographic (XY)",
             transform=ax.transAxes, ha="right", va="top")
 
     ax = subplot(224)
-    camera = ortho
-    mesh = Mesh(ax, camera, vertices, faces,
+    mesh = Mesh(ax, camera.transform, vertices, faces,
                 facecolors=white,  edgecolors=black, linewidths=.25)
+    camera.link(ax, mesh.update, proj=ortho, view=view)
+    camera.animate(mesh.collection)
     ax.text(.99, .99, "Orthographic (ZY)",
             transform=ax.transAxes, ha="right", va="top")
 
@@ -8,7 +8,13 @@ import numpy as np
 from mpl3d import glm
 from mpl3d.mesh import Mesh
 from mpl3d.camera import Camera
-import meshio
+from mpl3d import bundle
+from mpl3d.io import read_obj
+
+
+def build():
+    vertices, faces = read_obj("data/bunny.obj")
+    return bundle.mesh(glm.fit_unit_cube(vertices), faces)
 
 
 # --- main --------------------------------------------------------------------
@@ -20,12 +26,11 @@ if __name__ == "__main__":
     ax.axis("off")
 
     camera = Camera("ortho", scale=2)
-    mesh = meshio.read("data/bunny.obj")
-    vertices = mesh.points
-    faces = mesh.cells[0].data
-    vertices = glm.fit_unit_cube(vertices)
-    mesh = Mesh(ax, camera.transform, vertices, faces,
+    # The mesh is prepared once and then loaded from data/bunny.bundle
+    # (until data/bunny.obj changes)
+    data = bundle.cache("data/bunny.bundle", ["data/bunny.obj"], build)
+    mesh = Mesh(ax, camera.transform, data["vertices"], data["faces"],
                 cmap=plt.get_cmap("magma"),  edgecolors=(0,0,0,0.25))
-    camera.connect(ax, mesh.update)
+    camera.connect(ax, mesh.update, mesh.interact)
     plt.savefig("bunny.png", dpi=600)
     plt.show()
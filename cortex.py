@@ -12,18 +12,27 @@ if __name__ == "__main__":
     import numpy as np
     from mpl3d import glm
     from mpl3d.mesh import Mesh
+    from mpl3d import bundle
     from mpl3d.lighting import lighting
     import matplotlib.pyplot as plt
     import nibabel as nb
 
+    # Lighting is baked into face colors (parameters are part of the key)
+    def build(direction, color):
+        vertices, faces = nb.freesurfer.io.read_geometry('data/lh.pial')
+        vertices = glm.fit_unit_cube(vertices)
+        facecolors = lighting(vertices[faces], direction=direction,
+                              color=color, specular=True)
+        return bundle.mesh(vertices, faces, facecolors)
+
     fig = plt.figure(figsize=(6,6))
     ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
     ax.axis("off")
 
-    vertices, faces = nb.freesurfer.io.read_geometry('data/lh.pial')
-    vertices = glm.fit_unit_cube(vertices)
-    facecolors = lighting(vertices[faces], direction=(-1,0,0.25),
-                          color=(1.0,0.5,0.5), specular=True)
+    data = bundle.cache("data/lh.pial.bundle", ["data/lh.pial"], build,
+                        direction=(-1,0,0.25), color=(1.0,0.5,0.5))
+    vertices, faces = data["vertices"], data["faces"]
+    facecolors = data["facecolors"]
 
     camera = glm.ortho(-1, +1, -1, +1, 1, 100)
     camera = camera @ glm.scale(1.9) @ glm.yrotate(90) @ glm.xrotate(270) 
@@ -0,0 +1,192 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import mpl3d.glm as glm
+import matplotlib as mpl
+from matplotlib.collections import PolyCollection
+from mpl3d.heightfield import eye
+
+        
+class Bar():
+    """
+    Bar (histogram)
+
+    Vertices, faces and colors of bars are built once (and rebuilt only when
+    heights or colors change, see `set_data` and `set_colors`) such that an
+    update only transforms vertices, computes depth and sorts faces.
+
+    Bars are adjacent (they touch each other) such that side faces hidden by
+    an adjacent bar at least as tall are found once (for given heights) and
+    never rendered. At each update, only the faces (at most three per bar)
+    that face the camera are rendered.
+    """
+    
+    def __init__(self, ax, transform,  Z, 
+                 facecolors="white", edgecolors="black",  linewidth=0, clip=False):
+        """ """
+        
+        self.linewidth = linewidth
+        self.xlim = -0.5, +0.50
+        self.ylim = -0.5, +0.50
+        self.zlim = -0.5, +0.50
+        self.clip = clip
+
+        # Because all the bars have the same orientation, we can use a hack to
+        # shade each face at once instead of computing individual face lighting.
+        self.shade = np.array([[1.00, 1.00, 0.75, 1.00, 0.50, 1.00]])
+
+        self.Z = np.asarray(Z)
+        self.set_colors(facecolors, edgecolors)
+        self.set_data(Z)
+
+        self.collection = PolyCollection([], clip_on=self.clip, snap=False)
+        self.update(transform)
+        ax.add_collection(self.collection, autolim=False)
+
+
+    def _colors(self, colors):
+        """ Colors as a (nx,ny,4) array """
+
+        if isinstance(colors, np.ndarray):
+            shape = colors.shape
+            colors = colors.reshape(-1,shape[-1])
+            colors = mpl.colors.to_rgba_array(colors)
+            return colors.reshape(shape[0], shape[1], 4)
+        result = np.zeros((self.Z.shape[0], self.Z.shape[1], 4))
+        result[...] = mpl.colors.to_rgba(colors)
+        return result
+
+
+    def set_colors(self, facecolors=None, edgecolors=None):
+        """
+        Set face and/or edge colors of bars (one color or one color per bar)
+        """
+
+        Z = self.Z
+        if facecolors is not None:
+            self.facecolors = self._colors(facecolors)
+            
+            # Face colors for the six faces
+            FC = np.zeros((Z.shape[0], Z.shape[1], 6, 4))
+            FC[:,:] = self.facecolors.reshape(Z.shape[0], Z.shape[1], 1, 4)
+            FC *= self.shade.T
+            FC[:,:,:,3] = 1
+            self.FC = FC.reshape(-1,4)
+
+        if edgecolors is not None:
+            self.edgecolors = self._colors(edgecolors)
+
+            # Edge colors for the six faces
+            EC = np.zeros((Z.shape[0], Z.shape[1], 6, 4))
+            EC[:,:] = self.edgecolors.reshape(Z.shape[0], Z.shape[1], 1, 4)
+            self.EC = EC.reshape(-1,4)
+
+
+    def set_data(self, Z):
+        """
+        Set heights of bars (with the same shape as current heights) and
+        rebuild vertices and faces
+        """
+
+        Z = self.Z = np.asarray(Z)
+        xmin, xmax = self.xlim
+        ymin, ymax = self.ylim
+        zmin, zmax = self.zlim
+        dx, dy = 0.5*(xmax-xmin)/Z.shape[1], 0.5*(ymax-ymin)/Z.shape[0]
+        
+        # Each bar is described by 8 vertices and 6 faces
+        V = np.zeros((Z.shape[0], Z.shape[1], 8, 3))
+        F = np.zeros((Z.shape[0], Z.shape[1], 6, 4), dtype=int)
+
+        # Build vertices
+        X,Y = np.meshgrid(np.linspace(xmin+dx, xmax-dx, Z.shape[1]),
+                          np.linspace(ymin+dy, ymax-dy, Z.shape[0]))
+        V[...,0] = X.reshape(Z.shape[0], Z.shape[1],1)
+        V[...,1] = Y.reshape(Z.shape[0], Z.shape[1],1)
+        
+        V[:,:,0] += [+dx, +dy, zmin]
+        V[:,:,1] += [+dx, -dy, zmin]
+        V[:,:,2] += [-dx, -dy, zmin]
+        V[:,:,3] += [-dx, +dy, zmin]
+        
+        V[:,:,4] += [+dx, +dy, zmin]
+        V[:,:,5] += [+dx, -dy, zmin]
+        V[:,:,6] += [-dx, -dy, zmin]
+        V[:,:,7] += [-dx, +dy, zmin]
+        V[:,:,4:,2] += Z.reshape(Z.shape[0], Z.shape[1],1)
+
+        # Build faces
+        I = 8*np.arange(Z.shape[0]*Z.shape[1])
+        F[:,:] = I.reshape(Z.shape[0], Z.shape[1], 1, 1)
+        F[:,:] +=  [ [0, 1, 2, 3], # -Z
+                     [0, 1, 5, 4], # +X
+                     [2, 3, 7, 6], # -X
+                     [1, 2, 6, 5], # -Y
+                     [0, 3, 7, 4], # +Y
+                     [4, 5, 6, 7]] # +Z
+
+        self.V = V.reshape(-1,3)
+        self.F = F.reshape(-1,4)
+
+        # Side faces hidden by an adjacent bar at least as tall
+        H = np.zeros((Z.shape[0], Z.shape[1], 6), dtype=bool)
+        H[:,:-1,1] = Z[:,:-1] <= Z[:,1:]   # +X
+        H[:,1:,2]  = Z[:,1:] <= Z[:,:-1]   # -X
+        H[1:,:,3]  = Z[1:,:] <= Z[:-1,:]   # -Y
+        H[:-1,:,4] = Z[:-1,:] <= Z[1:,:]   # +Y
+        self.hidden = H.reshape(-1,6)
+
+        # Planes of the six faces of each bar (as coordinate and axis)
+        self.planes = np.zeros((Z.size, 6))
+        self.planes[:,0] = zmin
+        self.planes[:,1] = (X + dx).ravel()
+        self.planes[:,2] = (X - dx).ravel()
+        self.planes[:,3] = (Y - dy).ravel()
+        self.planes[:,4] = (Y + dy).ravel()
+        self.planes[:,5] = zmin + Z.ravel()
+
+
+    def _facing(self, transform):
+        """
+        Faces facing the camera, as a (n,6) boolean array.
+        """
+
+        E = eye(transform)
+
+        # Faces whose plane is between the bar and the camera
+        axis = [2, 0, 0, 1, 1, 2]
+        sign = np.array([-1, +1, -1, -1, +1, +1])
+        return sign*(E[axis] - self.planes*E[3]) > 0
+
+        
+    def update(self, transform):
+        """ Update bars according to transform (4x4 array) """
+
+        # Visible faces
+        J = np.flatnonzero(self._facing(transform) & ~self.hidden)
+
+        # Actual transformation (of the 8 vertices of each bar)
+        P = glm.transform(self.V, transform)
+        V = P[self.F[J]]
+
+        # Depth computation
+        # We combine the global "depth" of the bar (depth of the bottom face)
+        # and the local depth of each face. This trick avoids problems when
+        # sorting all the different faces.
+        Z1 = P[:,2].reshape(-1,8)[:,:4].mean(axis=1)
+        Z2 = V[...,2].mean(axis=1) + 10*Z1[J//6]
+
+        # Sorting
+        I = np.argsort(-Z2)
+        V = V[...,:2]
+        
+        self.collection.set_verts(V[I])
+        self.collection.set_facecolors(self.FC[J[I]])
+        self.collection.set_edgecolors(self.EC[J[I]])
+        self.collection.set_linewidths(self.linewidth)
+        if self.linewidth == 0.0:
+            self.collection.set_antialiased(False)
+        else:
+            self.collection.set_antialiased(True)
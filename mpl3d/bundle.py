@@ -0,0 +1,141 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# A bundle is a mesh that has been prepared once (vertices, faces, normals,
+# colors and levels of detail) and saved as a directory of .npy files, such
+# that it can be loaded (memory-mapped) almost instantly. Memory-mapped files
+# are shared between processes using the same bundle.
+# -----------------------------------------------------------------------------
+import os
+import json
+import hashlib
+import numpy as np
+import mpl3d.glm as glm
+from mpl3d.lod import pyramid
+
+
+def digest(sources, **params):
+    """
+    Content hash of source files and (build) parameters.
+    """
+
+    sha = hashlib.sha1()
+    for filename in sources:
+        with open(filename, "rb") as file:
+            for chunk in iter(lambda: file.read(2**20), b""):
+                sha.update(chunk)
+    sha.update(repr(sorted(params.items())).encode())
+    return sha.hexdigest()
+
+
+def _dtype(array):
+    """ Dtype of an array in a bundle (float32 or int32) """
+
+    array = np.asarray(array)
+    if np.issubdtype(array.dtype, np.integer):
+        return np.int32
+    return np.float32
+
+
+def save(path, bundle, key=""):
+    """
+    Save a bundle (dict of arrays and an optional list of levels of detail
+    as given by lod.pyramid) into directory path.
+
+    Arrays are stored as float32 (or int32 for integer arrays). Files are
+    replaced (not overwritten) such that processes that have memory-mapped
+    a previous version are not affected, and the bundle description
+    (including key) is written last such that an interrupted save results
+    in a stale bundle.
+    """
+
+    os.makedirs(path, exist_ok=True)
+    meta = os.path.join(path, "bundle.json")
+    if os.path.exists(meta):
+        os.remove(meta)
+
+    arrays = {name: array for name, array in bundle.items() if name != "levels"}
+    for i, (V, F, I, size) in enumerate(bundle.get("levels", [])):
+        arrays.update({"level-%d-vertices" % i: V, "level-%d-faces" % i: F,
+                       "level-%d-index" % i: I})
+    for name, array in arrays.items():
+        filename = os.path.join(path, name + ".npy")
+        with open(filename + ".tmp", "wb") as file:
+            np.save(file, np.ascontiguousarray(array, dtype=_dtype(array)))
+        os.replace(filename + ".tmp", filename)
+    for filename in os.listdir(path):
+        if filename.endswith(".npy") and filename[:-4] not in arrays:
+            os.remove(os.path.join(path, filename))
+
+    with open(meta, "w") as file:
+        json.dump({"key": key, "arrays": sorted(arrays),
+                   "sizes": [float(level[3])
+                             for level in bundle.get("levels", [])]}, file)
+
+
+def load(path, mmap_mode="r"):
+    """
+    Load a bundle from directory path, arrays being memory-mapped (see
+    numpy.load). Levels of detail (if any) are given as a list (see
+    lod.pyramid).
+    """
+
+    with open(os.path.join(path, "bundle.json")) as file:
+        meta = json.load(file)
+    bundle = {name: np.load(os.path.join(path, name + ".npy"),
+                            mmap_mode=mmap_mode) for name in meta["arrays"]}
+    bundle["levels"] = [(bundle.pop("level-%d-vertices" % i),
+                         bundle.pop("level-%d-faces" % i),
+                         bundle.pop("level-%d-index" % i), size)
+                        for i, size in enumerate(meta["sizes"])]
+    return bundle
+
+
+def key(path):
+    """ Key of the bundle in directory path (None if there is no bundle) """
+
+    try:
+        with open(os.path.join(path, "bundle.json")) as file:
+            return json.load(file)["key"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def mesh(vertices, faces, facecolors=None, lod=0):
+    """
+    Prepare a mesh bundle: vertices, faces, face normals, face colors (if
+    given) and lod levels of detail.
+    """
+
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces)
+    T = vertices[faces]
+    bundle = {"vertices": vertices, "faces": faces,
+              "normals": glm.normalize(np.cross(T[:,1]-T[:,0], T[:,2]-T[:,0]))}
+    if facecolors is not None:
+        bundle["facecolors"] = facecolors
+    if lod:
+        bundle["levels"] = pyramid(vertices, faces, lod)
+    return bundle
+
+
+def cache(path, sources, build, **params):
+    """
+    Load the bundle in directory path, building it first (using build(**params)
+    that must return a bundle) if it does not exist or if it is stale, i.e.
+    if the source files or the parameters have changed since it was built.
+
+    The code of build is not part of the key: any value that build depends
+    on (e.g. a lighting direction) must be given as a parameter, and a
+    version parameter can be bumped whenever the build code changes.
+
+    Example
+    -------
+    bundle = cache("data/bunny.bundle", ["data/bunny.obj"], build, lod=4)
+    """
+
+    current = digest(sources, **params)
+    if key(path) != current:
+        save(path, build(**params), current)
+    return load(path)
@@ -18,6 +18,15 @@ class Camera():
 
     In any case, the camera transformation is kept in the `Camera.transform`
     variable.
+
+    Other axes can be linked to a connected camera (see `link`) such that a
+    drag in any of them rotates all the linked views at once, each view
+    having its own (optional) projection and fixed relative rotation. The
+    figure is then redrawn only once per event.
+
+    Artists registered using `animate` (e.g. mesh.collection) are blitted
+    while dragging: the rest of the figure is rendered once when the drag
+    starts and cached, and only these artists are redrawn on top of it.
     """
     
     def __init__(self, mode="perspective", theta=0, phi=0, scale=1):
@@ -55,7 +64,7 @@ class Camera():
                 self.aperture, self.aspect, self.near, self.far)
         self.transform = self.proj @ self.view @ self.trackball.model.T
 
-    def connect(self, axes, update):
+    def connect(self, axes, update, interact=None):
         """
         axes : matplotlib.Axes
            Axes where to connect this camera to
@@ -63,13 +72,23 @@ class Camera():
         update: function(transform)
            Function to be called with the new transform to update the scene
            (transform is a 4x4 matrix).
+
+        interact: function(state)
+           Function to be called with True when a drag starts and with False
+           when it ends (optional). The scene can use it to render a coarse
+           version while dragging, the scene being updated and redrawn once
+           more at the end of the drag.
         """
         
         self.figure = axes.get_figure()
         self.axes = axes
         self.update = update
+        self.interact = interact
+        self.links = []
         self.mouse = None
-        self.cidpress = self.figure.canvas.mpl_connect(
+        self.artists = []
+        self.background = None
+        self.cidscroll = self.figure.canvas.mpl_connect(
             'scroll_event', self.on_scroll)
         self.cidpress = self.figure.canvas.mpl_connect(
             'button_press_event', self.on_press)
@@ -77,27 +96,100 @@ class Camera():
             'button_release_event', self.on_release)
         self.cidmotion = self.figure.canvas.mpl_connect(
             'motion_notify_event', self.on_motion)
+        self.ciddraw = self.figure.canvas.mpl_connect(
+            'draw_event', self.on_draw)
+        self.cidresize = self.figure.canvas.mpl_connect(
+            'resize_event', self.on_resize)
+
+        self.axes.format_coord = self.format_coord
+
+
+    def link(self, axes, update, interact=None, proj=None, rotation=None,
+             view=None):
+        """
+        Link another axes to this (connected) camera.
+
+        axes : matplotlib.Axes
+           Axes to be linked (in the same figure)
+
+        update: function(transform)
+           Function to be called with the transform of the linked view
+
+        interact: function(state)
+           Function to be called when a drag starts or ends (optional)
+
+        proj : array (4x4)
+           Projection of the linked view (default is camera projection)
+
+        rotation : array (4x4)
+           Fixed rotation of the linked view relatively to the camera
+
+        view : array (4x4)
+           View of the linked view, e.g. with its own scale (default is
+           camera view)
+        """
+
+        proj = self.proj if proj is None else proj
+        view = self.view if view is None else view
+        rotation = np.eye(4) if rotation is None else rotation
+        transform = proj @ view @ rotation
+        self.links.append((axes, update, interact, transform))
+        axes.format_coord = self.format_coord
+        update(transform @ self.trackball.model.T)
+
+
+    def animate(self, *artists):
+        """
+        Register artists (of connected or linked axes) that are the only ones
+        redrawn while dragging (blitting). They are animated during drags
+        only, such that they are rendered as usual otherwise (e.g. savefig).
+
+        artists : matplotlib.Artist
+           Artists to be blitted (e.g. mesh.collection or mesh.image)
+        """
+
+        self.artists.extend(artists)
+
+
+    def blitting(self):
+        """
+        Whether artists are blitted while dragging
+        """
+
+        return len(self.artists) > 0 and self.figure.canvas.supports_blit
+
+
+    def format_coord(self, *args):
+        """
+        Trackball angles (displayed in the toolbar)
+        """
+        phi = self.trackball.phi
+        theta = self.trackball.theta
+        return "Θ : %.1f, ɸ: %.1f" % (theta, phi)
+
+
+    def views(self):
+        """
+        Connected and linked views as (axes, update, interact) tuples
+        """
+
+        return ([(self.axes, self.update, self.interact)] +
+                [link[:3] for link in self.links])
 
-        def format_coord(*args):
-            phi = self.trackball.phi
-            theta = self.trackball.theta
-            return "Θ : %.1f, ɸ: %.1f" % (theta, phi)
-        self.axes.format_coord = format_coord
-                
 
-        
     def on_scroll(self, event):
         """
         Scroll event for zooming in/out
         """
-        if event.inaxes != self.axes:     return
-        
+        if event.inaxes not in [axes for axes, _, _ in self.views()]: return
+
         if event.button == "up":
             self.zoom  = max(0.9*self.zoom, self.zoom_min)
         elif event.button == "down":
             self.zoom = min(1.1*self.zoom, self.zoom_max)
-        self.axes.set_xlim(-self.zoom,self.zoom)
-        self.axes.set_ylim(-self.zoom,self.zoom)
+        for axes, _, _ in self.views():
+            axes.set_xlim(-self.zoom,self.zoom)
+            axes.set_ylim(-self.zoom,self.zoom)
         self.figure.canvas.draw()
 
         
@@ -105,38 +197,109 @@ class Camera():
         """
         Press event to initiate a drag
         """
-        if event.inaxes != self.axes:     return
-        
-        self.mouse = event.button, event.xdata, event.ydata
+        if event.inaxes not in [axes for axes, _, _ in self.views()]: return
+
+        self.mouse = event.button, event.xdata, event.ydata, event.inaxes
+        for _, _, interact in self.views():
+            if interact is not None:
+                interact(True)
+        if self.blitting():
+            # The background is cached during this draw (see on_draw)
+            for artist in self.artists:
+                artist.set_animated(True)
+            self.figure.canvas.draw()
+
+
+    def on_draw(self, event):
+        """
+        Draw event to cache the background (without animated artists) and
+        draw animated artists on top of it while dragging
+        """
+        if self.mouse is None or not self.blitting(): return
+
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+
+    def on_resize(self, event):
+        """
+        Resize event to invalidate the cached background
+        """
+        self.background = None
+
+
+    def refresh(self):
+        """
+        Redraw the figure or, while dragging, only the animated artists on
+        top of the cached background.
+        """
+
+        canvas = self.figure.canvas
+        if self.mouse is None or self.background is None:
+            canvas.draw()
+            return
+        canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+        canvas.flush_events()
+
+
+    def redraw(self):
+        """
+        Update all views using the current trackball rotation and redraw
+        the figure (once).
+        """
+
+        model = self.trackball.model.T
+        self.transform = self.proj @ self.view @ model
+        self.update(self.transform)
+        for _, update, _, transform in self.links:
+            update(transform @ model)
+        self.refresh()
+
 
-        
     def on_motion(self, event):
         """
         Motion event to rotate the scene
         """
         if self.mouse is None:            return
-        if event.inaxes != self.axes:     return
-        
+        if event.inaxes != self.mouse[3]: return
+
         button, x, y = event.button, event.xdata, event.ydata
         dx, dy = x-self.mouse[1], y-self.mouse[2]
-        self.mouse = button, x, y
+        self.mouse = button, x, y, event.inaxes
         self.trackball.drag_to(x, y, dx, dy)
-        self.transform = self.proj @ self.view @ self.trackball.model.T
-        self.update(self.transform)
-        self.figure.canvas.draw()
+        self.redraw()
+
 
-        
     def on_release(self, event):
         """
         End of drag event
         """
+        if self.mouse is None:            return
+
         self.mouse = None
+        self.background = None
+        for artist in self.artists:
+            artist.set_animated(False)
+        interactive = False
+        for _, _, interact in self.views():
+            if interact is not None:
+                interact(False)
+                interactive = True
+        if interactive:
+            self.redraw()
+
 
-        
     def disconnect(self):
         """
         Disconnect camera from the axes
         """
+        self.figure.canvas.mpl_disconnect(self.cidscroll)
         self.figure.canvas.mpl_disconnect(self.cidpress)
         self.figure.canvas.mpl_disconnect(self.cidrelease)
         self.figure.canvas.mpl_disconnect(self.cidmotion)
+        self.figure.canvas.mpl_disconnect(self.ciddraw)
+        self.figure.canvas.mpl_disconnect(self.cidresize)
@@ -235,7 +235,13 @@ def fit_unit_cube(V):
     return V
 
     
-def transform(V, mvp, viewport=None):
+def affine(M):
+    """ Whether transform M is affine (w is always 1, e.g. orthographic) """
+
+    return M[3,0] == 0 and M[3,1] == 0 and M[3,2] == 0 and M[3,3] == 1
+
+
+def transform(V, mvp, viewport=None, out=None):
     """
     Apply transform mvp to vertices V
 
@@ -250,24 +256,40 @@ def transform(V, mvp, viewport=None):
     viewport: 4x4 array
       Viewport matrix (default is None)
 
+    out: (n,3) array
+      Output array (default is None)
+
     Returns
     -------
-    (n,3) array of transformed vertices
+    (n,3) array of transformed vertices (float32 vertices stay float32)
+
+    Notes
+    -----
+    The homogeneous coordinate is never built: vertices are multiplied by
+    the linear part of the transform and translated. The perspective divide
+    is skipped for affine transforms (see `affine`).
     """
     
-    V = np.asarray(V) 
+    V = np.asarray(V)
     shape = V.shape
     V = V.reshape(-1,3)
-    ones = np.ones(len(V), dtype=float)
-    V = np.c_[V.astype(float), ones]      # Homogenous coordinates
-    V = V @ mvp.T                         # Transformed coordinates
-    if viewport is not None:
-        V = V @ viewport.T
-    V = V/V[:,3].reshape(-1,1)            # Normalization
-    V = V[:,:3]                           # Normalized device coordinates
-    return V.reshape(shape)
-
+    if out is None:
+        dtype = V.dtype if V.dtype in (np.float32, np.float64) else float
+        out = np.empty(shape, dtype=dtype)
+    M = mvp if viewport is None else viewport @ mvp
+    M = np.asarray(M, dtype=out.dtype)
+
+    P = out.reshape(-1,3)
+    if not affine(M):
+        W = V @ M[3,:3]                   # Homogeneous coordinate
+        W += M[3,3]
+    np.matmul(V, M[:3,:3].T, out=P)       # Transformed coordinates
+    P += M[:3,3]
+    if not affine(M):
+        P /= W.reshape(-1,1)              # Normalized device coordinates
+    return out
 
+    
 def frontback(T):
     """
     Sort front and back facing triangles
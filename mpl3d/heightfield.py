@@ -0,0 +1,194 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import mpl3d.glm as glm
+import mpl3d.lighting as lighting
+import matplotlib as mpl
+from matplotlib.collections import PolyCollection
+
+
+def eye(transform):
+    """
+    Camera position in object space, i.e. the point whose clip x, y and w
+    are zero (direction toward the camera for affine transforms)
+    """
+
+    E = np.linalg.svd(transform[[0,1,3]])[2][-1]
+    if abs(E[3]) > 1e-12:
+        E /= E[3]
+    else:
+        E[3] = 0
+        if transform[2,:3] @ E[:3] > 0:
+            E = -E
+    return E
+
+
+def project(transform, x, y, Z):
+    """
+    Screen coordinates of the grid points (x[j], y[i], Z[i,j]) as a
+    (ny*nx,2) array
+    """
+
+    M = transform
+    x, y = np.asarray(x), np.asarray(y).reshape(-1,1)
+    P = np.empty(Z.shape + (2,))
+    for i in range(2):
+        P[...,i] = M[i,2]*Z + (M[i,0]*x + M[i,1]*y + M[i,3])
+    if not glm.affine(M):
+        P /= (M[3,2]*Z + (M[3,0]*x + M[3,1]*y + M[3,3]))[...,np.newaxis]
+    return P.reshape(-1,2)
+
+
+def order(E, x, y):
+    """
+    Cells of the grid (x, y) from back to front for a camera at E (see eye),
+    as the (flat) index of their first grid point. Coordinates must be
+    increasing.
+
+    A segment from the camera to any point of a height field crosses cells
+    whose row and column indices move monotonically toward the camera, such
+    that cells are ordered by traversing rows, then columns, away from the
+    camera position (in each of the four quadrants around it).
+    """
+
+    groups = []
+    for v, e in ((y, E[1]), (x, E[0])):
+        n = len(v)
+        if E[3] == 0:
+            k = n-1 if e > 0 else 0
+        else:
+            k = int(np.clip(np.searchsorted(v, e, "right")-1, 0, n-1))
+        groups.append((np.arange(k), np.arange(n-2, k-1, -1)))
+
+    (rows, cols), nx = groups, len(x)
+    return np.concatenate([(R.reshape(-1,1)*nx + C).ravel()
+                           for R in rows for C in cols])
+
+
+def normals(x, y, Z):
+    """
+    Unit normals of cells (finite differences at cell centers) as a
+    ((ny-1)*(nx-1),3) array
+    """
+
+    dx = np.diff(x).reshape(1,-1)
+    dy = np.diff(y).reshape(-1,1)
+    N = np.ones((len(y)-1, len(x)-1, 3))
+    N[...,0] = -((Z[:-1,1:] + Z[1:,1:]) - (Z[:-1,:-1] + Z[1:,:-1])) / (2*dx)
+    N[...,1] = -((Z[1:,:-1] + Z[1:,1:]) - (Z[:-1,:-1] + Z[:-1,1:])) / (2*dy)
+    return glm.normalize(N.reshape(-1,3))
+
+
+class HeightField():
+    """
+    Height field over a regular grid
+
+    Only heights are stored: the grid topology (one quad per cell) is
+    implicit and only the screen coordinates of the grid points are computed
+    at each update. Cells are rendered in back to front order without any
+    sort (see `order`).
+
+    Cells can be shaded at each update by a list of directional `lights`
+    given in camera space (see Mesh). Normals are computed once using finite
+    differences.
+    """
+
+    def __init__(self, ax, transform, Z, extent=(-0.5, 0.5, -0.5, 0.5),
+                 facecolors="white", edgecolors="none", linewidths=0,
+                 lights=None):
+        """
+        Parameters
+        ----------
+        Z : ndarray (ny,nx)
+            Heights of grid points (rows along y and columns along x)
+
+        extent : (float, float, float, float)
+            Extent (xmin, xmax, ymin, ymax) of the grid
+
+        facecolors, edgecolors : color or ndarray
+            One color, one color per grid point (ny,nx,4) or one color per
+            cell (ny-1,nx-1,4)
+        """
+
+        self.extent = extent
+        self.linewidths = linewidths
+        self.lights = lights
+        self.ambient = 0.2
+        self.diffuse = 0.8
+        self.specular = 0.5
+        self.shininess = 32
+        self.set_data(Z)
+        self.set_colors(facecolors, edgecolors)
+
+        self.collection = PolyCollection([], clip_on=False, snap=False)
+        self.update(transform)
+        ax.add_collection(self.collection, autolim=False)
+
+
+    def _colors(self, colors):
+        """ Colors as a (ny-1)*(nx-1) x 4 array (one per cell) or a 1x4 array """
+
+        ny, nx = self.Z.shape
+        if isinstance(colors, np.ndarray) and colors.ndim == 3:
+            C = mpl.colors.to_rgba_array(colors.reshape(-1,colors.shape[-1]))
+            C = C.reshape(colors.shape[0], colors.shape[1], 4)
+            if C.shape[:2] == (ny, nx):
+                C = (C[:-1,:-1] + C[:-1,1:] + C[1:,:-1] + C[1:,1:]) / 4
+            return C.reshape(-1,4)
+        return mpl.colors.to_rgba_array(colors)
+
+
+    def set_colors(self, facecolors=None, edgecolors=None):
+        """ Set face and/or edge colors """
+
+        if facecolors is not None:
+            self.facecolors = self._colors(facecolors)
+        if edgecolors is not None:
+            self.edgecolors = self._colors(edgecolors)
+
+
+    def set_data(self, Z):
+        """ Set heights (with the same shape as current heights) """
+
+        Z = self.Z = np.asarray(Z, dtype=float)
+        ny, nx = Z.shape
+        xmin, xmax, ymin, ymax = self.extent
+        self.x = np.linspace(xmin, xmax, nx)
+        self.y = np.linspace(ymin, ymax, ny)
+
+        self.normals = normals(self.x, self.y, Z)
+
+        # Grid points of each cell (as offsets to the first one)
+        self._corners = np.array([0, 1, nx+1, nx])
+
+
+    def update(self, transform):
+        """ Update height field according to transform (4x4 array) """
+
+        P = project(transform, self.x, self.y, self.Z)
+        I = order(eye(transform), self.x, self.y)
+        V = P[I.reshape(-1,1) + self._corners]
+
+        # Cell index (from index of first grid point)
+        nx = self.Z.shape[1]
+        J = I - I//nx
+
+        facecolors = self.facecolors
+        if len(facecolors) > 1:
+            facecolors = facecolors[J]
+        if self.lights:
+            N = lighting.camera_normals(self.normals[J], transform)
+            facecolors = lighting.shade(N, facecolors, self.lights,
+                                        self.ambient, self.diffuse,
+                                        self.specular, self.shininess)
+        edgecolors = self.edgecolors
+        if len(edgecolors) > 1:
+            edgecolors = edgecolors[J]
+
+        self.collection.set_verts(V)
+        self.collection.set_facecolors(facecolors)
+        self.collection.set_edgecolors(edgecolors)
+        self.collection.set_linewidths(self.linewidths)
+        self.collection.set_antialiased(self.linewidths > 0)
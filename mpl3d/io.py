@@ -0,0 +1,293 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# Mesh readers (wavefront OBJ, PLY and STL) returning vertices (n,3) and
+# triangular faces (m,3) that can be given to Mesh. Text files are parsed in
+# bulk (lines are selected using numpy masks over the whole file and parsed
+# with a single call to numpy.fromstring) and binary files are read through
+# (memory-mapped) structured arrays, without copy when possible.
+# -----------------------------------------------------------------------------
+import re
+import numpy as np
+
+
+def _lines(buffer, *prefixes):
+    """
+    Text of all the lines of buffer (uint8 array) starting with one of the
+    given prefixes (e.g. b"v "), leading spaces and prefixes being removed.
+
+    Returns
+    -------
+    text and indices of the selected lines (in the whole buffer)
+    """
+
+    start = np.r_[0, np.flatnonzero(buffer == ord("\n")) + 1]
+    end = np.r_[start[1:], len(buffer)]
+    buffer = np.r_[buffer, np.zeros(max(map(len, prefixes)), dtype=np.uint8)]
+
+    # Skip leading spaces
+    while True:
+        space = ((buffer[start] == ord(" ")) | (buffer[start] == ord("\t")))
+        space &= start < end
+        if not space.any():
+            break
+        start[space] += 1
+
+    # Lines matching one of the prefixes (that are blanked)
+    selected = np.zeros(len(start), dtype=bool)
+    for prefix in prefixes:
+        match = end - start > len(prefix)
+        for i, c in enumerate(prefix):
+            match &= buffer[start+i] == c
+        for i in range(len(prefix)):
+            buffer[start[match]+i] = ord(" ")
+        selected |= match
+
+    # Runs of consecutive selected lines
+    index = np.flatnonzero(selected)
+    runs = np.flatnonzero(np.diff(index) != 1) + 1
+    first, last = index[np.r_[0, runs]], index[np.r_[runs-1, len(index)-1]]
+    data = memoryview(buffer)
+    text = b"".join(data[i:j] for i, j in zip(start[first], end[last]))
+    return text, index
+
+
+def _triangulate(polygons, count):
+    """
+    Triangulate polygons (as a flat array of indices and the number of
+    vertices of each polygon) using fans.
+    """
+
+    count = np.asarray(count)
+    first = np.cumsum(count) - count
+    n = count - 2
+    polygon = np.repeat(np.arange(len(count)), n)
+    i = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    base = first[polygon]
+    return np.stack([polygons[base], polygons[base+i+1], polygons[base+i+2]], -1)
+
+
+def read_obj(filename):
+    """
+    Read a wavefront OBJ file (vertices and faces only).
+
+    Faces with more than three vertices are triangulated. Texture and
+    normal indices as well as comments are ignored and negative (relative)
+    indices are taken relative to the vertices declared before each face.
+
+    Returns
+    -------
+    vertices (n,3) and faces (m,3)
+    """
+
+    buffer = np.fromfile(filename, dtype=np.uint8)
+
+    text, V = _lines(buffer, b"v ", b"v\t")
+    if b"#" in text:
+        text = re.sub(rb"#[^\n]*", b"", text)
+    vertices = np.fromstring(text, sep=" ")
+    vertices = vertices.reshape(len(V), -1)[:,:3] if len(V) else np.zeros((0,3))
+
+    # Each face (line) starts with a 0 (invalid index) such that faces can be
+    # found in the flat list of indices
+    text, F = _lines(buffer, b"f ", b"f\t")
+    if not len(F):
+        return vertices, np.zeros((0,3), dtype=int)
+    if b"#" in text:
+        text = re.sub(rb"#[^\n]*", b"", text)
+    if b"/" in text:
+        text = re.sub(rb"/\S*", b"", text)
+    text = text.replace(b"\n", b" 0 ")
+    indices = np.fromstring(b"0 " + text, dtype=np.int64, sep=" ")
+    start = np.flatnonzero(indices == 0)
+    count = (np.diff(np.r_[start, len(indices)]) - 1)[:len(F)]
+    indices = np.delete(indices, start)
+
+    # Relative indices refer to the vertices declared before each face
+    before = np.repeat(np.searchsorted(V, F), count)
+    indices = np.where(indices < 0, indices + before, indices - 1)
+    count = count[count > 0]
+    if (count == 3).all():
+        return vertices, indices.reshape(-1,3)
+    return vertices, _triangulate(indices, count)
+
+
+# PLY types
+_types = {"char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+          "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+          "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+          "float": "f4", "float32": "f4", "double": "f8", "float64": "f8"}
+
+
+def _header(buffer):
+    """
+    Parse a PLY header.
+
+    Returns
+    -------
+    format (encoding), size of header and list of elements as (name, count,
+    properties), properties being (name, type) or (name, (count type,
+    index type)) for lists.
+    """
+
+    end = bytes(buffer[:65536]).find(b"end_header")
+    if end < 0:
+        raise ValueError("Invalid PLY header")
+    end = bytes(buffer[:end+64]).index(b"\n", end) + 1
+    encoding, elements = None, []
+    for line in bytes(buffer[:end]).decode("ascii").splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "format":
+            encoding = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and words[1] == "list":
+            elements[-1][2].append((words[4], (_types[words[2]],
+                                               _types[words[3]])))
+        elif words[0] == "property":
+            elements[-1][2].append((words[2], _types[words[1]]))
+    return encoding, end, elements
+
+
+def read_ply(filename):
+    """
+    Read a PLY file (binary or ascii) with vertex and face elements.
+
+    Binary vertices and triangular faces are returned as (strided) views of
+    the memory-mapped file. Faces with more than three vertices are
+    triangulated.
+
+    Returns
+    -------
+    vertices (n,3) and faces (m,3)
+    """
+
+    buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+    encoding, offset, elements = _header(buffer)
+    if encoding == "ascii":
+        return _read_ply_ascii(buffer[offset:], elements)
+    order = {"binary_little_endian": "<", "binary_big_endian": ">"}[encoding]
+
+    vertices, faces = None, None
+    for name, count, properties in elements:
+        lists = [kind for _, kind in properties if isinstance(kind, tuple)]
+        if lists and len(properties) > 1:
+            raise ValueError("Unsupported PLY element (%s)" % name)
+
+        elif lists:
+            # Lists are first assumed to have the same size as the first one
+            # and are read sequentially when it is not the case
+            size, index = np.dtype(order+lists[0][0]), np.dtype(order+lists[0][1])
+            n = int(np.frombuffer(buffer, size, 1, offset)[0])
+            dtype = np.dtype([("n", size), ("v", index, n)])
+            available = (len(buffer) - offset) // dtype.itemsize
+            data = np.frombuffer(buffer, dtype, min(count, available), offset)
+            if len(data) == count and (data["n"] == n).all():
+                polygons, sizes = data["v"], np.full(count, n)
+                offset += count * dtype.itemsize
+            else:
+                polygons, sizes = [], []
+                for i in range(count):
+                    k = int(np.frombuffer(buffer, size, 1, offset)[0])
+                    offset += size.itemsize
+                    polygons.append(np.frombuffer(buffer, index, k, offset))
+                    offset += k*index.itemsize
+                    sizes.append(k)
+                polygons = np.concatenate(polygons)
+            if name == "face":
+                faces = polygons if n == 3 and polygons.ndim == 2 else \
+                        _triangulate(np.ravel(polygons), sizes)
+
+        else:
+            dtype = np.dtype([(p, order+kind) for p, kind in properties])
+            data = np.frombuffer(buffer, dtype, count, offset)
+            offset += count * dtype.itemsize
+            if name == "vertex":
+                vertices = _xyz(data)
+
+    if vertices is None or faces is None:
+        raise ValueError("PLY file has no vertex or face element")
+    return vertices, faces
+
+
+def _xyz(data):
+    """
+    Vertices (n,3) from a structured array with x, y and z fields, as a view
+    when x, y and z are contiguous and have the same type.
+    """
+
+    dtype = data.dtype
+    names = list(dtype.names)
+    i = names.index("x")
+    if names[i:i+3] == ["x", "y", "z"] and dtype["x"] == dtype["y"] == dtype["z"]:
+        view = np.dtype({"names": ["xyz"], "formats": [(dtype["x"], 3)],
+                         "offsets": [dtype.fields["x"][1]],
+                         "itemsize": dtype.itemsize})
+        return data.view(view)["xyz"]
+    return np.stack([data[c] for c in "xyz"], -1)
+
+
+def _read_ply_ascii(buffer, elements):
+    """ Read the body of an ascii PLY file (with same size faces) """
+
+    values = np.fromstring(bytes(buffer), sep=" ")
+    vertices, faces = None, None
+    for name, count, properties in elements:
+        width = 0
+        for _, kind in properties:
+            width += 1 + (int(values[width]) if isinstance(kind, tuple) else 0)
+        data = values[:count*width].reshape(count, width)
+        values = values[count*width:]
+        names = [p for p, _ in properties]
+        if name == "vertex":
+            vertices = data[:,[names.index(c) for c in "xyz"]]
+        elif name == "face":
+            if len(properties) > 1 or (data[:,0] != width-1).any():
+                raise ValueError("Unsupported PLY face element (ascii)")
+            faces = _triangulate(data[:,1:].astype(np.int64).ravel(),
+                                 np.full(count, width-1))
+    if vertices is None or faces is None:
+        raise ValueError("PLY file has no vertex or face element")
+    return vertices, faces
+
+
+def read_stl(filename, weld=True):
+    """
+    Read a STL file (binary or ascii).
+
+    STL files store the three vertices of each triangle such that vertices
+    are shared between triangles only after welding identical vertices.
+
+    Returns
+    -------
+    vertices (n,3) and faces (m,3)
+    """
+
+    buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+    count = int(np.frombuffer(buffer, "<u4", 1, 80)[0]) if len(buffer) > 84 else 0
+    if len(buffer) == 84 + 50*count:
+        dtype = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3,3)),
+                          ("attribute", "<u2")])
+        vertices = np.frombuffer(buffer, dtype, count, 84)["vertices"]
+    else:
+        text, _ = _lines(buffer, b"vertex ", b"vertex\t")
+        vertices = np.fromstring(text, dtype=np.float32, sep=" ")
+    vertices = vertices.reshape(-1,3)
+    faces = np.arange(len(vertices)).reshape(-1,3)
+    if not weld:
+        return vertices, faces
+
+    # Identical vertices, found using a hash of their bytes (and checked
+    # afterward since different vertices may have the same hash)
+    V = np.ascontiguousarray(vertices, dtype=np.float32)
+    U = V.view(np.uint32).astype(np.uint64)
+    key = (U[:,0] * 73856093) ^ (U[:,1] * 19349663 << 21) ^ (U[:,2] << 42)
+    _, index, inverse = np.unique(key, return_index=True, return_inverse=True)
+    if (V[index][inverse] != V).any():
+        key = V.view(np.dtype((np.void, 12))).ravel()
+        _, index, inverse = np.unique(key, return_index=True,
+                                      return_inverse=True)
+    return V[index], inverse.reshape(-1,3)
@@ -0,0 +1,141 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# Isosurface extraction from a 3d scalar field (marching cubes). The triangle
+# table is built by splitting each cell (cube between 8 grid points) into 6
+# tetrahedra around its main diagonal and by cutting each tetrahedron. The
+# split is the same for all cells such that the faces of neighbor cells match,
+# which avoids the ambiguous cases (and holes) of the original table.
+# -----------------------------------------------------------------------------
+import numpy as np
+from mpl3d.volume import bricks
+
+
+# Corners of a cell (corner c is at (c&1, c>>1&1, c>>2&1))
+_corners = np.array([[c & 1, (c >> 1) & 1, (c >> 2) & 1] for c in range(8)])
+
+# Tetrahedra of a cell (sharing the 0-7 diagonal). Along any of their edges
+# (a,b) with a < b, bits of a are bits of b such that an edge is given by its
+# first corner and a direction (b-a) in 1-7.
+_tetrahedra = [[0,1,3,7], [0,3,2,7], [0,2,6,7],
+               [0,6,4,7], [0,4,5,7], [0,5,1,7]]
+
+
+def _table():
+    """
+    Triangles for each of the 256 cases of a cell (bit c is set when corner
+    c is inside). Triangles are oriented such that their normal points
+    toward the outside.
+
+    Returns
+    -------
+    (256,) number of triangles and (256,12,3,2) triangles edges given as
+    (corner, direction)
+    """
+
+    count = np.zeros(256, dtype=int)
+    edges = np.zeros((256,12,3,2), dtype=int)
+    for case in range(256):
+        triangles = []
+        for tetrahedron in _tetrahedra:
+            inside = [c for c in tetrahedron if (case >> c) & 1]
+            outside = [c for c in tetrahedron if not (case >> c) & 1]
+            if len(inside) in (1, 3):
+                lone = inside[0] if len(inside) == 1 else outside[0]
+                others = [c for c in tetrahedron if c != lone]
+                triangles.append([(lone, c) for c in others])
+            elif len(inside) == 2:
+                (i, j), (k, l) = inside, outside
+                triangles.append([(i,k), (i,l), (j,l)])
+                triangles.append([(i,k), (j,l), (j,k)])
+            else:
+                continue
+            # Orientation (using edges middle)
+            for triangle in triangles[-(len(inside) == 2)-1:]:
+                T = [(_corners[a]+_corners[b])/2 for a, b in triangle]
+                N = np.cross(T[1]-T[0], T[2]-T[0])
+                G = (_corners[outside].mean(axis=0) -
+                     _corners[inside].mean(axis=0))
+                if (N*G).sum() < 0:
+                    triangle.reverse()
+        for i, triangle in enumerate(triangles):
+            for j, (a, b) in enumerate(triangle):
+                a, b = min(a,b), max(a,b)
+                edges[case,i,j] = a, b-a
+        count[case] = len(triangles)
+    return count, edges
+
+_count, _edges = _table()
+
+
+def isosurface(data, level, extent=(-0.5, 0.5, -0.5, 0.5, -0.5, 0.5),
+               index=None):
+    """
+    Extract the isosurface of a scalar field at given level.
+
+    Parameters
+    ----------
+    data : ndarray (nx,ny,nz)
+        Scalar field
+
+    level : float
+        Value of the isosurface
+
+    extent : (float, float, float, float, float, float)
+        Extent of the field as (xmin, xmax, ymin, ymax, zmin, zmax), grid
+        points being at the center of voxels (see Volume).
+
+    index : (vmin, vmax, size)
+        Brick index of the field (see volume.bricks). Only cells of bricks
+        crossing the level are considered. It is computed if not given but
+        it should be computed once when extracting several levels of the
+        same field.
+
+    Returns
+    -------
+    vertices (n,3) and faces (m,3), faces being oriented such that their
+    normals point toward lower values.
+    """
+
+    data = np.asarray(data)
+    values = data.ravel()
+    n = np.array(data.shape)
+    vmin, vmax, size = index if index is not None else bricks(data)
+    offset = (_corners[:,0]*n[1] + _corners[:,1])*n[2] + _corners[:,2]
+
+    # Cells of active bricks (as flat index of their first corner)
+    B = np.argwhere((vmin < level) & (vmax >= level))
+    C = np.stack(np.meshgrid(*[np.arange(size)]*3, indexing="ij"), -1)
+    C = (B[:,np.newaxis]*size + C.reshape(1,-1,3)).reshape(-1,3)
+    C = C[(C < n-1).all(axis=1)]
+    cells = (C[:,0]*n[1] + C[:,1])*n[2] + C[:,2]
+
+    # Case of each cell
+    case = np.zeros(len(cells), dtype=np.uint8)
+    for c in range(8):
+        case |= (values[cells + offset[c]] >= level).astype(np.uint8) << c
+    active = _count[case] > 0
+    cells, case = cells[active], case[active]
+
+    # Triangles edges
+    count = _count[case]
+    cell = np.repeat(np.arange(len(cells)), count)
+    triangle = np.arange(len(cell)) - np.repeat(np.cumsum(count)-count, count)
+    E = _edges[case[cell], triangle]
+    key = (cells[cell].reshape(-1,1) + offset[E[...,0]])*8 + E[...,1]
+
+    # Weld vertices on shared edges and interpolate them
+    key, faces = np.unique(key.ravel(), return_inverse=True)
+    faces = faces.reshape(-1,3)
+    a = key // 8
+    b = a + offset[key % 8]
+    va, vb = values[a], values[b]
+    t = ((level - va) / (vb - va)).reshape(-1,1)
+    A = np.stack(np.unravel_index(a, data.shape), -1)
+    vertices = A + t*_corners[key % 8]
+
+    # Voxel coordinates to extent
+    lo, hi = np.asarray(extent, dtype=float).reshape(3,2).T
+    vertices = lo + (vertices + 0.5) / n * (hi - lo)
+    return vertices, faces
@@ -7,49 +7,101 @@ from mpl3d import glm
 
 
 def compact(vertices, indices, tolerance=1e-3):
-    """ Compact vertices and indices within given tolerance """
-
-    # Transform vertices into a structured array for np.unique to work
-    n = len(vertices)
-    V = np.zeros(n, dtype=[("pos", np.float32, 3)])
-    V["pos"][:,0] = vertices[:,0]
-    V["pos"][:,1] = vertices[:,1]
-    V["pos"][:,2] = vertices[:,2]
-
-    epsilon = 1e-3
-    decimals = int(np.log(epsilon)/np.log(1/10.))
-
-    # Round all vertices within given decimals
-    V_ = np.zeros_like(V)
-    X = V["pos"][:,0].round(decimals=decimals)
-    X[np.where(abs(X) < epsilon)] = 0
-
-    V_["pos"][:,0] = X
-    Y = V["pos"][:,1].round(decimals=decimals)
-    Y[np.where(abs(Y) < epsilon)] = 0
-    V_["pos"][:,1] = Y
+    """
+    Compact vertices and indices within given tolerance
 
-    Z = V["pos"][:,2].round(decimals=decimals)
-    Z[np.where(abs(Z) < epsilon)] = 0
-    V_["pos"][:,2] = Z
+    Vertices are hashed on a grid whose cells are tolerance wide and the
+    vertices of a same cell are merged. Each vertex is further compared with
+    every vertex of the neighbor cells, and cells having vertices closer
+    than tolerance are merged, such that near duplicates on each side of a
+    cell boundary are merged too.
 
-    # Find the unique vertices AND the mapping
-    U, RI = np.unique(V_, return_inverse=True)
+    Parameters
+    ----------
 
-    # Translate indices from original vertices into the reduced set (U)
-    indices = indices.ravel()
-    I_ = indices.copy().ravel()
-    for i in range(len(indices)):
-        I_[i] = RI[indices[i]]
-    I_ = I_.reshape(len(indices)//3,3)
+    vertices : ndarray (n,3)
+        triangles vertices
 
-    # Return reduced vertices set, transalted indices and mapping that allows
-    # to go from U to V
-    return U.view(np.float32).reshape(len(U),3), I_, RI
+    indices : ndarray (p,3)
+        triangles indices
 
+    tolerance : float
+        distance under which vertices are merged (0 for exact duplicates)
 
+    Returns
+    -------
+    compacted vertices (mean of merged vertices), translated indices and
+    mapping from original to compacted vertices.
+    """
 
-def normals(vertices, indices, compact=True):
+    V = np.asarray(vertices)
+    n = len(V)
+
+    # Cell of each vertex (unique vertices when there is no tolerance)
+    if tolerance > 0:
+        C = np.floor((V - V.min(axis=0)) / tolerance).astype(np.int64)
+    else:
+        _, C = np.unique(V, axis=0, return_inverse=True)
+        C = np.c_[C.ravel(), np.zeros((n,2), dtype=np.int64)]
+    shape = C.max(axis=0) + 3
+    key = ((C[:,0]+1)*shape[1] + C[:,1]+1)*shape[2] + C[:,2]+1
+    keys, cell = np.unique(key, return_inverse=True)
+    cell = cell.ravel()
+    k = len(keys)
+
+    # Union of neighbor cells with close vertices (propagating the smallest
+    # cell label until convergence)
+    label = np.arange(k)
+    if tolerance > 0:
+        # Vertices sorted by cell such that the vertices of a cell are a
+        # range of the sorted vertices (one half of the 26 neighbor cells is
+        # enough since pairs are symmetric)
+        order = np.argsort(cell, kind="stable")
+        size = np.bincount(cell, minlength=k)
+        begin = np.cumsum(size) - size
+        A, B = [], []
+        for offset in np.ndindex(3, 3, 3):
+            if offset <= (1, 1, 1):
+                continue
+            dx, dy, dz = np.array(offset) - 1
+            neighbor = keys + (dx*shape[1] + dy)*shape[2] + dz
+            j = np.searchsorted(keys, neighbor).clip(0, k-1)
+            j = np.where(keys[j] == neighbor, j, -1)[cell]
+
+            # Each vertex paired with every vertex of the neighbor cell
+            i = np.flatnonzero(j >= 0)
+            j = j[i]
+            count = size[j]
+            i = np.repeat(i, count)
+            j = np.repeat(begin[j] - (np.cumsum(count) - count), count)
+            j = order[j + np.arange(len(j))]
+            D = V[i] - V[j]
+            close = (D*D).sum(axis=-1) < tolerance*tolerance
+            A.append(cell[i[close]])
+            B.append(cell[j[close]])
+        A, B = np.concatenate(A), np.concatenate(B)
+        while len(A):
+            previous = label.copy()
+            L = np.minimum(label[A], label[B])
+            np.minimum.at(label, A, L)
+            np.minimum.at(label, B, L)
+            label = label[label]
+            if (label == previous).all():
+                break
+
+    # Compacted vertices and mapping
+    _, mapping = np.unique(label[cell], return_inverse=True)
+    mapping = mapping.ravel()
+    count = np.bincount(mapping)
+    U = np.stack([np.bincount(mapping, V[:,i]) for i in range(3)], -1)
+    U /= count.reshape(-1,1)
+
+    return U, mapping[np.asarray(indices)], mapping
+
+_compact = compact
+
+
+def normals(vertices, indices, compact=True, tolerance=1e-3):
     """
     Compute normals over a triangulated surface
 
@@ -63,22 +115,25 @@ def normals(vertices, indices, compact=True):
         triangles indices
 
     compact : bool
-        whether to compact vertices before computing normals (default False)
+        whether to compact vertices before computing normals (default True)
+
+    tolerance : float
+        distance under which vertices are merged when compacting
     """
 
     # Compact similar vertices
     if compact:
-        vertices, indices, mapping = compact(vertices, indices)
+        vertices, indices, mapping = _compact(vertices, indices, tolerance)
 
     T = vertices[indices]
     N = np.cross(T[:,1 ]-T[:,0], T[:,2]-T[:,0])
     L = np.sqrt(np.sum(N*N,axis=1))
     L[L==0] = 1.0  # prevent divide-by-zero
     N /= L[:, np.newaxis]
-    normals = np.zeros_like(vertices)
-    normals[indices[:,0] ] += N
-    normals[indices[:,1] ] += N
-    normals[indices[:,2] ] += N
+    normals = np.zeros(vertices.shape)
+    np.add.at(normals, indices[:,0], N)
+    np.add.at(normals, indices[:,1], N)
+    np.add.at(normals, indices[:,2], N)
     L = np.sqrt(np.sum(normals*normals, axis=1))
     L[L== 0] = 1.0
     normals /= L[:,np.newaxis]
@@ -107,3 +162,81 @@ def lighting(F, direction=(1,1,1), color=(1,0,0), specular=False):
         return np.maximum(diffuse*color, specular)
     
     return diffuse*color
+
+
+def camera_normals(N, transform, out=None):
+    """
+    Rotate object space normals into camera space (x right, y up and z
+    toward the viewer, whatever the projection) and flip them toward the
+    viewer (two sided lighting)
+
+    Parameters
+    ----------
+
+    N : ndarray (m,3)
+        unit normals in object space
+
+    transform : ndarray (4,4)
+        model-view-projection transform
+
+    out : ndarray (m,3)
+        output array (default is None)
+    """
+
+    R = transform[:3,:3] / np.linalg.norm(transform[:3,:3], axis=1)[:,None]
+    R[2] *= -1
+    N = np.matmul(N, R.T, out=out)
+    N *= np.where(N[:,2:] < 0, -1.0, 1.0)
+    return N
+
+
+def shade(N, colors, lights, ambient=0.2, diffuse=0.8,
+          specular=0.5, shininess=32, out=None):
+    """
+    Shade faces using the Blinn-Phong model with several directional lights
+
+    Parameters
+    ----------
+
+    N : ndarray (m,3)
+        unit face normals in camera space (x right, y up, z toward viewer)
+
+    colors : ndarray (m,4) or (1,4)
+        faces colors (alpha is kept)
+
+    lights : list of (direction, color)
+        direction (toward the light, in camera space) and rgb color of
+        each light
+
+    ambient, diffuse, specular : float
+        strength of ambient, diffuse and specular terms
+
+    shininess : float
+        specular exponent
+
+    out : ndarray (m,4)
+        output array (default is None)
+
+    Returns
+    -------
+    (m,4) array of shaded colors
+    """
+
+    m = len(N)
+    out = np.empty((m,4)) if out is None else out
+    D = np.zeros((m,3))
+    S = np.zeros((m,3))
+    for direction, color in lights:
+        color = np.asarray(color, dtype=float)[:3]
+        L = glm.normalize(np.asarray(direction, dtype=float))
+        d = np.maximum(N @ L, 0)
+        D += d.reshape(-1,1) * color
+        if specular > 0:
+            H = glm.normalize(L + (0,0,1))
+            s = np.power(np.maximum(N @ H, 0), shininess) * (d > 0)
+            S += s.reshape(-1,1) * color
+    out[:,:3] = colors[:,:3] * (ambient + diffuse*D) + specular*S
+    out[:,3] = colors[:,3]
+    np.clip(out, 0, 1, out=out)
+    return out
+
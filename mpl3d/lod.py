@@ -0,0 +1,200 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+def facesize(vertices, faces):
+    """ Typical size of faces (square root of twice the mean face area) """
+
+    T = vertices[faces]
+    N = np.cross(T[:,1]-T[:,0], T[:,2]-T[:,0])
+    return np.sqrt(np.sqrt((N*N).sum(axis=-1)).mean())
+
+
+def decimate(vertices, faces, size):
+    """
+    Decimate a triangulated surface using vertex clustering.
+
+    Vertices are clustered over a regular grid with given cell size and each
+    cluster is replaced by the point minimizing the (area weighted) quadric
+    error of the faces around it, falling back to the mean position of the
+    cluster when this point is ill-defined or outside the cell. Faces that
+    become degenerate or duplicated are removed.
+
+    Parameters
+    ----------
+    vertices : ndarray (n,3)
+        triangles vertices
+
+    faces : ndarray (p,3)
+        triangles indices
+
+    size : float
+        cell size of the clustering grid
+
+    Returns
+    -------
+    vertices (k,3), faces (q,3) and the index (q,) of the original face each
+    decimated face comes from.
+    """
+
+    V = np.asarray(vertices, dtype=float)
+    F = np.asarray(faces)
+
+    # Cluster of each vertex
+    C = np.floor((V - V.min(axis=0)) / size).astype(np.int64)
+    shape = C.max(axis=0) + 1
+    key = (C[:,0]*shape[1] + C[:,1])*shape[2] + C[:,2]
+    _, cluster = np.unique(key, return_inverse=True)
+    cluster = cluster.ravel()
+    k = cluster.max() + 1
+
+    # Mean position of each cluster
+    count = np.bincount(cluster, minlength=k).reshape(-1,1)
+    mean = np.stack([np.bincount(cluster, V[:,i], k) for i in range(3)], -1)
+    mean /= count
+
+    # Face quadrics: planes n.x + d = 0 (with area weighted normals)
+    T = V[F]
+    N = np.cross(T[:,1]-T[:,0], T[:,2]-T[:,0])
+    L = np.sqrt((N*N).sum(axis=-1)).reshape(-1,1)
+    L[L == 0] = 1
+    N = N / np.sqrt(L)
+    D = -(N*T[:,0]).sum(axis=-1)
+    A = (N[:,:,np.newaxis]*N[:,np.newaxis,:]).reshape(-1,9)
+    B = -N*D[:,np.newaxis]
+
+    # Accumulate quadrics onto clusters of each face vertex
+    I = cluster[F].ravel()
+    QA = np.stack([np.bincount(I, np.repeat(A[:,i],3), k)
+                   for i in range(9)], -1).reshape(-1,3,3)
+    QB = np.stack([np.bincount(I, np.repeat(B[:,i],3), k)
+                   for i in range(3)], -1)
+
+    # Minimize quadric error, regularized toward the mean position
+    eps = 1e-3 * np.trace(QA, axis1=1, axis2=2).reshape(-1,1) + 1e-12
+    QA += eps[:,:,np.newaxis] * np.eye(3)
+    QB += eps * mean
+    P = np.linalg.solve(QA, QB[...,np.newaxis])[...,0]
+    outside = np.abs(P-mean).max(axis=-1) > size
+    P[outside] = mean[outside]
+
+    # Remove degenerate and duplicated faces
+    F = cluster[F]
+    valid = (F[:,0] != F[:,1]) & (F[:,1] != F[:,2]) & (F[:,2] != F[:,0])
+    index = np.flatnonzero(valid)
+    F = F[index]
+    S = np.sort(F, axis=1)
+    S = (S[:,0]*k + S[:,1])*k + S[:,2]
+    _, unique = np.unique(S, return_index=True)
+    unique.sort()
+
+    return P, F[unique], index[unique]
+
+
+def pyramid(vertices, faces, levels=4, ratio=2.0):
+    """
+    Build a level of detail pyramid of a triangulated surface.
+
+    Parameters
+    ----------
+    vertices : ndarray (n,3)
+        triangles vertices
+
+    faces : ndarray (p,3)
+        triangles indices
+
+    levels : int
+        number of decimated levels
+
+    ratio : float
+        ratio of the clustering cell size between two successive levels
+        (each level has roughly ratio² less faces than the previous one)
+
+    Returns
+    -------
+    list of (vertices, faces, index, size) for each decimated level, from
+    finest to coarsest, where index is the index of the original face each
+    decimated face comes from and size is the typical size of faces.
+    """
+
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces)
+    cell = facesize(vertices, faces)
+    result = []
+    for level in range(levels):
+        cell *= ratio
+        V, F, I = decimate(vertices, faces, cell)
+        if len(F) == 0:
+            break
+        result.append((V, F, I, facesize(V, F)))
+    return result
+
+
+def octree(vertices, sizes, facecolors, edgecolors, depth=8):
+    """
+    Build a level of detail hierarchy of a point cloud.
+
+    Points are clustered into the cells of an octree (levels of a regular
+    grid whose cells are halved from one level to the next) and each cell is
+    replaced by a single point with mean position, size and colors. Each
+    level is built by merging the cells of the next (finer) one.
+
+    Parameters
+    ----------
+    vertices : ndarray (n,3)
+        points positions
+
+    sizes : ndarray (n,)
+        points sizes
+
+    facecolors, edgecolors : ndarray (n,4)
+        points colors
+
+    depth : int
+        depth of the finest level (with 2^depth cells per side)
+
+    Returns
+    -------
+    list of (vertices, sizes, facecolors, edgecolors, count, index, size)
+    for each level, from finest to coarsest, where count is the number of
+    points in each cell, index gives the cell of each point of the previous
+    (finer) level (or of each original point for the finest level) and size
+    is the size of cells.
+    """
+
+    V = np.asarray(vertices, dtype=float)
+    vmin = V.min(axis=0)
+    extent = max((V.max(axis=0) - vmin).max(), 1e-12)
+    C = np.floor((V - vmin) / extent * 2**depth).astype(np.int64)
+    C = C.clip(0, 2**depth - 1)
+
+    # Attributes are accumulated as sums (weighted by counts) over cells
+    count = np.ones(len(V))
+    data = np.c_[V, sizes, facecolors, edgecolors]
+
+    result, index = [], None
+    for level in range(depth, 0, -1):
+        n = 2**level
+        key = (C[:,0]*n + C[:,1])*n + C[:,2]
+        _, first, cluster = np.unique(key, return_index=True,
+                                      return_inverse=True)
+        cluster = cluster.ravel()
+        k = len(first)
+        data = np.stack([np.bincount(cluster, data[:,i], k)
+                         for i in range(data.shape[1])], -1)
+        count = np.bincount(cluster, count, k)
+        C = C[first] // 2
+        index = cluster if index is None else cluster[index]
+        if result and k == len(result[-1][0]):
+            continue
+        mean = data / count.reshape(-1,1)
+        result.append((mean[:,:3], mean[:,3], mean[:,4:8], mean[:,8:12],
+                       count, index, extent / n))
+        index = None
+        if k == 1:
+            break
+    return result
+
@@ -4,84 +4,703 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 import mpl3d.glm as glm
+import mpl3d.raster as raster
+import mpl3d.lighting as lighting
+from mpl3d.lod import pyramid
 import matplotlib as mpl
+from matplotlib.image import AxesImage
 from matplotlib.collections import PolyCollection
 
 
+class RasterImage(AxesImage):
+    """
+    Image that is rendered again (using the given rasterize function) just
+    before being drawn
+    """
+
+    def __init__(self, ax, rasterize, **kwargs):
+        super().__init__(ax, **kwargs)
+        self._rasterize = rasterize
+
+    def draw(self, renderer, *args, **kwargs):
+        self._rasterize()
+        super().draw(renderer, *args, **kwargs)
+
+
 class Mesh():
     """
     Mesh described by vertices and faces
+
+    All the intermediate arrays needed during an update (transformed
+    vertices, faces, depth, culling masks, sorted faces and colors) live in
+    a workspace owned by the mesh. They are allocated on the first update
+    and reused afterward such that a steady-state update (e.g. during a
+    camera drag) does not allocate new arrays.
+
+    A level of detail pyramid can be built at creation (`lod` levels) or
+    given as a list of levels (see lod.pyramid), e.g. from a bundle. The
+    level that is rendered is then chosen at each update such that the size
+    of projected faces is about `lod_size` pixels.
+
+    While the mesh is interacted with (see `interact`), a coarser proxy
+    (`draft`) of at most `draft_size` faces is rendered instead.
+
+    Besides back (or front) face culling, faces can be culled when they are
+    outside of the axes limits or of the near/far range (`frustum`) or when
+    their projected area is less than `min_area` square pixels. Faces that
+    are hidden by nearer faces can also be culled (`occlusion`) using a
+    coarse depth buffer whose cells are `occlusion` pixels wide. The number
+    of faces removed by each test during last update is given by `culled`.
+
+    Faces are rendered as polygons (`backend="polygons"`), sorted from back
+    to front, or rasterized into an image at the pixel resolution of the axes
+    using a z-buffer (`backend="raster"`). The latter is much faster for very
+    large meshes but ignores edges.
+
+    Faces can be shaded at each update by a list of directional `lights`
+    given in camera space, such that lighting follows the camera. Face
+    normals are computed once (per level of detail, unless `normals` are
+    given) and only rotated for faces that survive culling (see `ambient`,
+    `diffuse`, `specular` and `shininess` for the material).
     """
-    
+
     def __init__(self, ax, transform,  vertices, faces,
                  cmap=None, facecolors="white", edgecolors="black",
-                 linewidths=0.5, mode="front"):
+                 linewidths=0.5, mode="front", lod=0, draft="lod",
+                 frustum=False, min_area=0, occlusion=0, backend="polygons",
+                 lights=None, normals=None):
         """
         """
-        
+
+        self.axes = ax
+        self.backend = backend
         self.collection = PolyCollection([], clip_on=False, snap=False)
+        self.image = RasterImage(ax, self._rasterize, origin="lower",
+                                 interpolation="nearest")
         self.vertices = vertices
-        self.faces = faces
+        self.faces = np.asarray(faces)
         self.cmap = cmap
-        self.facecolors = mpl.colors.to_rgba_array(facecolors)
-        self.edgecolors = mpl.colors.to_rgba_array(edgecolors)
+        self.facecolors = mpl.colors.to_rgba_array(facecolors).astype(float)
+        self.edgecolors = mpl.colors.to_rgba_array(edgecolors).astype(float)
         self.linewidths = linewidths
         self.mode = mode
+        self.frustum = frustum
+        self.min_area = min_area
+        self.occlusion = occlusion
+        self.culled = {}
+        self._buffers = {}
+        self._projected = None
+        self._w = None
+        self._raster = None
+        self._raster_key = None
+
+        # Decimated levels of detail as (vertices, faces, index, size)
+        if isinstance(lod, int):
+            self.levels = pyramid(vertices, self.faces, lod) if lod else []
+        else:
+            # Given levels (e.g. from a bundle) may use smaller integers
+            self.levels = [(V, np.asarray(F, dtype=np.intp),
+                            np.asarray(I, dtype=np.intp), size)
+                           for V, F, I, size in lod]
+        self.level = 0
+        self.lod_size = 1.0
+        self._center = np.append(np.mean(vertices, axis=0), 1)
+
+        # Proxy used during interaction ("lod", "bbox" or None)
+        self.draft = draft
+        self.draft_size = 10000
+        self.interactive = False
+
+        # Lights as (direction, color) in camera space and material
+        self.lights = lights
+        self.ambient = 0.2
+        self.diffuse = 0.8
+        self.specular = 0.5
+        self.shininess = 32
+        self._normals = {0: normals} if normals is not None else {}
+
+        # Maximum view change (degrees) for reusing previous depth order
+        self.coherence = 5.0
+        self._order = None
+        self._rotation = None
+        self._swap = 0
+
+        if cmap is not None:
+            self._lut = cmap(np.arange(cmap.N))
         self.update(transform)
-        ax.add_collection(self.collection, autolim=False)
-        
-        
+        if backend == "raster":
+            ax.add_image(self.image)
+        else:
+            ax.add_collection(self.collection, autolim=False)
+
+
+    def __len__(self):
+        """ Number of faces """
+
+        return len(self.faces)
+
+
+    def _buffer(self, name, shape, dtype=float):
+        """
+        Return a scratch array with given name and shape from the workspace.
+
+        The underlying storage is only reallocated when it is too small, such
+        that the same memory is reused from one update to the next.
+        """
+
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+
+    def _transform(self, transform, vertices, faces):
+        """
+        Transform vertices and gather them per face
+
+        Returns
+        -------
+        (m,k,3) array of transformed faces (k vertices per face)
+        """
+
+        n, (m, k) = len(vertices), faces.shape
+
+        # Normalized device coordinates
+        P = self._buffer("projected", (n,3))
+        glm.transform(vertices, transform, out=P)
+        self._projected = P
+
+        # Homogeneous coordinate (only needed for frustum culling)
+        self._w = None
+        if self.frustum and not glm.affine(transform):
+            self._w = self._buffer("w", (n,))
+            np.matmul(vertices, transform[3,:3], out=self._w)
+            self._w += transform[3,3]
+
+        T = self._buffer("faces", (m,k,3))
+        np.take(P, faces, axis=0, out=T, mode="clip")
+        return T
+
+
+    def _orientation(self, T):
+        """
+        Orientation (shoelace formula) of the first triangle of transformed
+        faces, negative for front facing triangles.
+        """
+
+        m = len(T)
+        A = self._buffer("orientation", (m,))
+        B = self._buffer("tmp1", (m,))
+        C = self._buffer("tmp2", (m,))
+        A[...] = 0
+        for i, j in ((0,1), (1,2), (2,0)):
+            np.subtract(T[:,j,0], T[:,i,0], out=B)
+            np.add(T[:,j,1], T[:,i,1], out=C)
+            B *= C
+            A += B
+        return A
+
+
+    def _select(self, transform):
+        """
+        Select the coarsest level of detail whose projected faces are smaller
+        than `lod_size` pixels (using the scale of the transform at the mesh
+        center and the current pixel extent of the axes).
+        """
+
+        w = transform[3] @ self._center
+        xmin, xmax = self.axes.get_xlim()
+        if not self.levels or w <= 0 or xmax == xmin:
+            return 0
+        pixels = self.axes.bbox.width / abs(xmax-xmin)
+        scale = np.linalg.norm(transform[0,:3]) / w * pixels
+        for level in range(len(self.levels), 0, -1):
+            if self.levels[level-1][3]*scale <= self.lod_size:
+                return level
+        return 0
+
+
+    def _geometry(self, transform):
+        """
+        Select vertices and faces to be rendered, depending on level of
+        detail and interaction.
+
+        Returns
+        -------
+        vertices, faces and index of faces in the original mesh (or None)
+        """
+
+        m = len(self.faces)
+        level = self._select(transform)
+        if self.interactive and self.draft == "lod":
+            # First level (not finer than selected one) that is small enough
+            # or subsampled faces if there is none
+            sizes = [m] + [len(F) for _, F, _, _ in self.levels]
+            levels = [l for l in range(level, len(sizes))
+                      if sizes[l] <= self.draft_size]
+            level = levels[0] if levels else -1
+        elif (self.interactive and self.draft == "bbox" and
+              self.backend != "raster"):
+            level = -2
+
+        if level != self.level:
+            self.level, self._order = level, None
+
+        if level == -1:
+            index = np.arange(0, m, int(np.ceil(m / self.draft_size)))
+            return self.vertices, self.faces[index], index
+        elif level == -2:
+            V = np.asarray(self.vertices)
+            (xmin, ymin, zmin), (xmax, ymax, zmax) = V.min(0), V.max(0)
+            vertices = [[xmin, ymin, zmin], [xmax, ymin, zmin],
+                        [xmax, ymax, zmin], [xmin, ymax, zmin],
+                        [xmin, ymin, zmax], [xmax, ymin, zmax],
+                        [xmax, ymax, zmax], [xmin, ymax, zmax]]
+            faces = np.array([[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4],
+                              [2, 3, 7, 6], [1, 2, 6, 5], [0, 4, 7, 3]])
+            return np.array(vertices), faces, None
+        elif level > 0:
+            return self.levels[level-1][:3]
+        return self.vertices, self.faces, None
+
+
+    def _facenormals(self, J, I):
+        """
+        Object space unit normals of faces J of current geometry (I being
+        their index in the original mesh), cached per level of detail.
+        """
+
+        level = max(self.level, 0)
+        if level not in self._normals:
+            if level > 0:
+                vertices, faces = self.levels[level-1][:2]
+            else:
+                vertices, faces = self.vertices, self.faces
+            T = np.asarray(vertices, dtype=float)[faces]
+            N = np.cross(T[:,1]-T[:,0], T[:,2]-T[:,0])
+            self._normals[level] = glm.normalize(N)
+        return self._normals[level][I if self.level == -1 else J]
+
+
+    def _shade(self, transform, J, I, facecolors):
+        """
+        Shade faces J (with given colors) using lights.
+        """
+
+        N = lighting.camera_normals(self._facenormals(J, I), transform,
+                                    out=self._buffer("normals", (len(J),3)))
+
+        return lighting.shade(N, facecolors, self.lights, self.ambient,
+                              self.diffuse, self.specular, self.shininess,
+                              out=self._buffer("shaded", (len(J),4)))
+
+
+    def interact(self, state):
+        """
+        Start (state is True) or stop (state is False) interaction
+        """
+
+        self.interactive = state
+
+
+    def _sort(self, D, Z, transform):
+        """
+        Sort faces according to depth D.
+
+        When the view only changed slightly since the last update (less than
+        `coherence` degrees), the previous order is nearly correct and is
+        refined using a (linear time) stable radix sort over depth quantized
+        on 16 bits: faces are correctly ordered up to 1/65535 of the depth
+        range Z and ties are kept in previous order. Otherwise, a full sort
+        is made.
+        """
+
+        m = len(D)
+        zmin, zmax = Z.min(), Z.max()
+        R = transform[:3,:3] / np.linalg.norm(transform[:3,:3], axis=1)[:,None]
+        coherent = (self._order is not None and len(self._order) == m
+                    and zmax > zmin)
+        if coherent:
+            cos = (np.trace(R @ self._rotation.T) - 1)/2
+            coherent = cos >= np.cos(np.radians(self.coherence))
+        self._rotation = R
+
+        if not coherent:
+            self._order = np.argsort(D)
+            return self._order
+
+        # Depth in previous order, quantized (culled faces go to the end)
+        K = self._buffer("sort-key", (m,))
+        np.take(D, self._order, out=K, mode="clip")
+        K -= zmin
+        K *= 65534/(zmax-zmin)
+        np.minimum(K, 65535, out=K)
+        Q = self._buffer("sort-bucket", (m,), np.uint16)
+        Q[...] = K
+
+        # Current and previous order use two buffers, swapped at each update
+        self._swap = 1 - self._swap
+        order = self._buffer("order-%d" % self._swap, (m,), np.intp)
+        np.take(self._order, np.argsort(Q, kind="stable"),
+                out=order, mode="clip")
+        self._order = order
+        return order
+
+
+    def _cull(self, T, faces):
+        """
+        Compute culled faces and count faces removed by each test
+
+        Returns
+        -------
+        (m,) boolean array of culled faces
+        """
+
+        m = len(T)
+        culled = self._buffer("culled", (m,), bool)
+        test = self._buffer("culled-test", (m,), bool)
+        culled[...] = False
+        self.culled = {}
+
+        def cull(name):
+            count = np.count_nonzero(culled)
+            culled[...] |= test
+            self.culled[name] = int(np.count_nonzero(culled) - count)
+
+        # Back face culling (front) or front face culling (back)
+        mode = "all" if self.level == -2 else self.mode
+        if mode in ["front", "back"] or self.min_area > 0:
+            A = self._orientation(T)
+        if mode == "front":
+            np.greater_equal(A, 0, out=test)
+            cull("mode")
+        elif mode == "back":
+            np.less(A, 0, out=test)
+            cull("mode")
+
+        xmin, xmax = sorted(self.axes.get_xlim())
+        ymin, ymax = sorted(self.axes.get_ylim())
+
+        # Frustum culling using vertex outcodes: a face is outside if all its
+        # vertices are outside of the same plane or if any of them is behind
+        # the camera.
+        if self.frustum:
+            P = self._projected
+            n = len(P)
+            code = self._buffer("outcode", (n,), np.uint8)
+            bit = self._buffer("outcode-bit", (n,), np.uint8)
+            outside = self._buffer("outside", (n,), bool)
+            code[...] = 0
+            for i, (compare, X, value) in enumerate([
+                    (np.less, P[:,0], xmin), (np.greater, P[:,0], xmax),
+                    (np.less, P[:,1], ymin), (np.greater, P[:,1], ymax),
+                    (np.less, P[:,2],   -1), (np.greater, P[:,2],   +1),
+                    (np.less_equal, self._w, 0)]):
+                if X is None:
+                    continue
+                compare(X, value, out=outside)
+                np.left_shift(outside.view(np.uint8), np.uint8(i), out=bit)
+                code |= bit
+
+            C = self._buffer("face-outcode", faces.shape, np.uint8)
+            np.take(code, faces, out=C, mode="clip")
+            every = self._buffer("face-outcode-and", (m,), np.uint8)
+            some = self._buffer("face-outcode-or", (m,), np.uint8)
+            np.bitwise_and.reduce(C, axis=1, out=every)
+            np.bitwise_or.reduce(C, axis=1, out=some)
+
+            # Outside of the axes limits
+            np.bitwise_and(every, 0b0001111, out=some)
+            np.not_equal(some, 0, out=test)
+            cull("frustum")
+
+            # Outside of the near/far range or behind the camera
+            np.bitwise_or.reduce(C, axis=1, out=some)
+            some &= 0b1000000
+            every &= 0b0110000
+            every |= some
+            np.not_equal(every, 0, out=test)
+            cull("depth")
+
+        # Sub-pixel faces
+        if self.min_area > 0:
+            pixels = (self.axes.bbox.width / (xmax-xmin) *
+                      self.axes.bbox.height / (ymax-ymin))
+            B = self._buffer("tmp1", (m,))
+            np.abs(A, out=B)
+            np.less(B, 2*self.min_area/pixels, out=test)
+            cull("area")
+
+        # Occlusion culling (of remaining faces) using a coarse depth buffer
+        if self.occlusion > 0:
+            shape = (int(np.ceil(self.axes.bbox.height / self.occlusion)),
+                     int(np.ceil(self.axes.bbox.width / self.occlusion)))
+            index = np.flatnonzero(~culled)
+            hidden = raster.occluded(T[index], shape, (xmin, xmax, ymin, ymax))
+            test[...] = False
+            test[index[hidden]] = True
+            cull("occlusion")
+
+        return culled
+
+
+    def _rasterize(self):
+        """
+        Render last faces (with their colors) into the image using a z-buffer
+        at the current pixel resolution of the axes. This is called at draw
+        time as well such that the image follows the renderer resolution
+        (e.g. when saving the figure with a different dpi).
+        """
+
+        if self._raster is None:
+            return
+        F, facecolors = self._raster
+        xmin, xmax = self.axes.get_xlim()
+        ymin, ymax = self.axes.get_ylim()
+        shape = (max(int(round(self.axes.bbox.height)), 1),
+                 max(int(round(self.axes.bbox.width)), 1))
+        key = shape, (xmin, xmax, ymin, ymax)
+        if key == self._raster_key:
+            return
+        self._raster_key = key
+
+        # Faces with more than 3 vertices are split in triangle fans
+        n, k = F.shape[:2]
+        T = np.concatenate([F[:,[0,i,i+1]] for i in range(1,k-1)])
+        _, index = raster.zbuffer(T, shape, (xmin, xmax, ymin, ymax))
+        index = index.ravel()
+        visible = index >= 0
+
+        image = np.zeros((shape[0]*shape[1], 4))
+        if len(facecolors) == n:
+            image[visible] = facecolors[index[visible] % n]
+        else:
+            image[visible] = facecolors[0]
+        self.image.set_data(image.reshape(shape[0], shape[1], 4))
+        self.image.set_extent((xmin, xmax, ymin, ymax))
+
+
     def update(self, transform):
         """
         Update mesh according to transform (4x4 array)
         """
-        
-        T = glm.transform(self.vertices, transform)[self.faces]
-        Z = -T[:,:,2].mean(axis=1)
 
-        if self.cmap is not None:
-            # Facecolors using depth buffer
-            norm = mpl.colors.Normalize(vmin=Z.min(),vmax=Z.max())
-            facecolors = self.cmap(norm(Z))
+        vertices, faces, index = self._geometry(transform)
+        T = self._transform(transform, vertices, faces)
+        m = len(T)
+
+        # Depth of each face
+        Z = self._buffer("depth", (m,))
+        np.mean(T[:,:,2], axis=1, out=Z)
+        np.negative(Z, out=Z)
+
+        # Culling
+        culled = self._cull(T, faces)
+        count = m - np.count_nonzero(culled)
+
+        if self.backend == "raster":
+            # Remaining faces (no sort needed with a z-buffer)
+            J = np.flatnonzero(~culled)
+        else:
+            # Sort faces according to depth (culled faces are sent to the end)
+            D = self._buffer("sort-depth", (m,))
+            np.copyto(D, Z)
+            np.copyto(D, np.inf, where=culled)
+            J = self._sort(D, Z, transform)[:count]
 
+        # Separate 2d triangles from zbuffer
+        S = self._buffer("sorted-faces", (count, T.shape[1], 3))
+        np.take(T, J, axis=0, out=S, mode="clip")
+        triangles = S[:,:,:2]
+
+        # Index of sorted faces in the original mesh (for per-face colors)
+        if index is not None:
+            I = self._buffer("source-index", (count,), np.intp)
+            np.take(index, J, out=I, mode="clip")
+        else:
+            I = J
+
+        # Facecolors using depth buffer
+        if self.cmap is not None:
+            N = len(self._lut)
+            zmin, zmax = Z.min(), Z.max()
+            L = self._buffer("sorted-depth", (count,))
+            np.take(Z, J, out=L, mode="clip")
+            L -= zmin
+            L *= N/(zmax-zmin) if zmax > zmin else 0
+            np.minimum(L, N-1, out=L)
+            K = self._buffer("lut-index", (count,), np.intp)
+            K[...] = L
+            facecolors = self._buffer("facecolors", (count,4))
+            np.take(self._lut, K, axis=0, out=facecolors, mode="clip")
+        elif len(self.facecolors) == len(self):
+            facecolors = self._buffer("facecolors", (count,4))
+            np.take(self.facecolors, I, axis=0, out=facecolors, mode="clip")
         else:
             facecolors = self.facecolors
-        edgecolors = self.edgecolors
+
+        if len(self.edgecolors) == len(self):
+            edgecolors = self._buffer("edgecolors", (count,4))
+            np.take(self.edgecolors, I, axis=0, out=edgecolors, mode="clip")
+        else:
+            edgecolors = self.edgecolors
+
+        # Lighting (of remaining faces only)
+        if self.lights and self.level != -2:
+            facecolors = self._shade(transform, J, I, facecolors)
+
+        if self.backend == "raster":
+            # (faces and colors are workspace arrays that are kept untouched
+            # until next update)
+            self._raster = S, facecolors
+            self._raster_key = None
+            self._rasterize()
+            return
+
         linewidths = self.linewidths
-        
-        # Back face culling
-        if self.mode == "front":
-            front, back = glm.frontback(T)
-            T, Z = T[front], Z[front]
-            if len(facecolors) == len(self.faces):
-                facecolors = facecolors[front]
-            if len(edgecolors) == len(self.faces):
-                edgecolors = edgecolors[front]
-
-        # Front face culling
-        elif self.mode == "back":
-            front, back = glm.frontback(T)
-            T, Z = T[back], Z[back]
-            if len(facecolors) == len(self.faces):
-                facecolors = facecolors[back]
-            if len(edgecolor) == len(self.faces):
-                edgecolors = edgecolors[back]
 
-        # Separate 2d triangles from zbuffer
-        triangles = T[:,:,:2]
+        # Bounding box is only outlined
+        if self.level == -2:
+            facecolors, edgecolors, linewidths = "none", "black", 0.5
+
         antialiased = linewidths > 0
-        
-        # Sort triangles according to z buffer
-        I = np.argsort(Z)
-        triangles = triangles[I,:]
-        if len(facecolors) == len(I):
-            facecolors = facecolors[I,:]
-        if len(edgecolors) == len(I):
-            edgecolors = edgecolors[I,:]
 
         self.collection.set_verts(triangles)
         self.collection.set_linewidths(linewidths)
         self.collection.set_facecolors(facecolors)
         self.collection.set_edgecolors(edgecolors)
         self.collection.set_antialiased(antialiased)
-        
+
+
+class InstancedMesh(Mesh):
+    """
+    Several instances of a single mesh, each with its own model matrix
+
+    The template geometry (vertices and faces) is stored only once and all
+    the instances are transformed in a single batched operation before being
+    culled and sorted together. Colors can be given for each face of the
+    template, for each instance or for each face of each instance.
+    """
+
+    def __init__(self, ax, transform, vertices, faces, models=None,
+                 offsets=None, scales=None, facecolors="white",
+                 edgecolors="black", **kwargs):
+        """
+        Parameters
+        ----------
+        models : ndarray (N,4,4)
+            Model matrix of each instance
+
+        offsets : ndarray (N,3)
+            Offset of each instance (when models is None)
+
+        scales : ndarray (N,) or (N,3)
+            Scale of each instance (when models is None)
+        """
+
+        if models is None:
+            offsets = np.zeros(3) if offsets is None else offsets
+            offsets = np.asarray(offsets, dtype=float).reshape(-1,3)
+            scales = np.asarray(1 if scales is None else scales, dtype=float)
+            scales = scales.reshape(-1, 3 if scales.ndim == 2 else 1)
+            N = max(len(offsets), len(scales))
+            models = np.zeros((N,4,4))
+            models[:,[0,1,2],[0,1,2]] = scales
+            models[:,:3,3] = offsets
+            models[:,3,3] = 1
+        self.models = np.asarray(models, dtype=float).reshape(-1,4,4)
+
+        N, m = len(self.models), len(faces)
+        facecolors = mpl.colors.to_rgba_array(facecolors)
+        edgecolors = mpl.colors.to_rgba_array(edgecolors)
+        if len(facecolors) == N and N != m:
+            facecolors = np.repeat(facecolors, m, axis=0)
+        elif len(facecolors) == m and m > 1:
+            facecolors = np.tile(facecolors, (N,1))
+        if len(edgecolors) == N and N != m:
+            edgecolors = np.repeat(edgecolors, m, axis=0)
+        elif len(edgecolors) == m and m > 1:
+            edgecolors = np.tile(edgecolors, (N,1))
+        Mesh.__init__(self, ax, transform, vertices, faces,
+                      facecolors=facecolors, edgecolors=edgecolors, **kwargs)
+
+
+    def __len__(self):
+        """ Number of faces (over all instances) """
+
+        return len(self.faces) * len(self.models)
+
+
+    def _geometry(self, transform):
+        """
+        Select template vertices and faces to be rendered and replicate
+        faces for each instance (see Mesh._geometry).
+        """
+
+        vertices, faces, index = Mesh._geometry(self, transform)
+        N, n, (m, k) = len(self.models), len(vertices), faces.shape
+        self._count = m
+
+        # Faces of instance i index the i-th block of transformed vertices
+        F = self._buffer("instanced-faces", (N,m,k), faces.dtype)
+        offset = self._buffer("instanced-offset", (N,1,1), faces.dtype)
+        offset[:,0,0] = np.arange(N) * n
+        np.add(faces, offset, out=F)
+
+        # Index of faces in the (virtual) instanced original mesh
+        if index is not None:
+            I = self._buffer("instanced-index", (N,m), np.intp)
+            np.add(index, np.arange(N).reshape(-1,1) * len(self.faces), out=I)
+            index = I.reshape(N*m)
+        return vertices, F.reshape(N*m,k), index
+
+
+    def _facenormals(self, J, I):
+        """
+        Object space unit normals of faces J, transformed by the inverse
+        transpose of the model matrix of their instance (such that normals
+        stay orthogonal to faces under non uniform scales).
+        """
+
+        m = self._count
+        N = Mesh._facenormals(self, J % m, I % len(self.faces))
+        R = np.linalg.inv(self.models[:, :3, :3])
+        return glm.normalize(np.einsum("nji,nj->ni", R[J // m], N))
+
+
+    def _transform(self, transform, vertices, faces):
+        """
+        Transform template vertices for all instances at once and gather
+        them per face
+
+        Returns
+        -------
+        (N*m,k,3) array of transformed faces (k vertices per face)
+        """
+
+        N, n, (m, k) = len(self.models), len(vertices), faces.shape
+
+        # Homogeneous coordinates (template)
+        H = self._buffer("homogeneous", (n,4))
+        H[:,:3] = vertices
+        H[:,3] = 1
+
+        # Transformed coordinates (all instances)
+        M = self._buffer("instanced-transform", (N,4,4))
+        np.matmul(transform, self.models, out=M)
+        V = self._buffer("vertices", (N,n,4))
+        np.matmul(H, M.transpose(0,2,1), out=V)
+        V = V.reshape(N*n,4)
+
+        # Normalized device coordinates
+        P = self._buffer("projected", (N*n,3))
+        np.divide(V[:,:3], V[:,3:], out=P)
+        self._projected = P
+        self._w = V[:,3]
+
+        T = self._buffer("faces", (m,k,3))
+        np.take(P, faces, axis=0, out=T, mode="clip")
+        return T
+
@@ -0,0 +1,164 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# Vectorized triangle rasterization over a regular grid of cells (pixels)
+# covering a rectangular extent (xmin, xmax, ymin, ymax). Cell (i,j) covers
+# column i and row j, row 0 being at ymin (i.e. origin is "lower").
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+def bbox(T, shape, extent, dilate=0):
+    """
+    Bounding box of triangles in cells (inclusive and clipped to the grid)
+
+    Parameters
+    ----------
+    T : (m,3,2+) array
+       Triangles
+
+    shape : (int, int)
+       Number of rows and columns of the grid
+
+    extent : (float, float, float, float)
+       Extent (xmin, xmax, ymin, ymax) of the grid
+
+    dilate : int
+       Number of cells to add on each side of the box
+
+    Returns
+    -------
+    (i0, i1, j0, j1) arrays of first/last columns and first/last rows
+    """
+
+    rows, cols = shape
+    xmin, xmax, ymin, ymax = extent
+    X = (T[...,0] - xmin) * (cols/(xmax-xmin))
+    Y = (T[...,1] - ymin) * (rows/(ymax-ymin))
+    i0 = np.floor(X.min(axis=-1)).clip(-1, cols).astype(int) - dilate
+    i1 = np.floor(X.max(axis=-1)).clip(-1, cols).astype(int) + dilate
+    j0 = np.floor(Y.min(axis=-1)).clip(-1, rows).astype(int) - dilate
+    j1 = np.floor(Y.max(axis=-1)).clip(-1, rows).astype(int) + dilate
+    return (np.maximum(i0, 0), np.minimum(i1, cols-1),
+            np.maximum(j0, 0), np.minimum(j1, rows-1))
+
+
+def cells(box, chunk=2**22):
+    """
+    Enumerate the cells of bounding boxes, by chunks of (about) chunk cells.
+
+    Yields
+    ------
+    (face, i, j) arrays giving the face, column and row of each cell
+    """
+
+    i0, i1, j0, j1 = box
+    width = np.maximum(i1-i0+1, 0)
+    count = width * np.maximum(j1-j0+1, 0)
+    total = np.cumsum(count)
+    start = 0
+    while start < len(count):
+        base = total[start-1] if start else 0
+        stop = max(np.searchsorted(total, base + chunk, "right"), start+1)
+        n = total[stop-1] - base
+        if n:
+            face = np.repeat(np.arange(start, stop), count[start:stop])
+            offset = np.arange(n) - (total[face] - count[face] - base)
+            yield (face, i0[face] + offset % width[face],
+                         j0[face] + offset // width[face])
+        start = stop
+
+
+def fragments(T, shape, extent, chunk=2**22):
+    """
+    Rasterize triangles, testing if cell centers are inside triangles.
+
+    Parameters
+    ----------
+    T : (m,3,3) array
+       Triangles
+
+    shape : (int, int)
+       Number of rows and columns of the grid
+
+    extent : (float, float, float, float)
+       Extent (xmin, xmax, ymin, ymax) of the grid
+
+    Yields
+    ------
+    (face, cell, depth) arrays giving the face, the (flat) cell index and the
+    interpolated depth (z) of each fragment
+    """
+
+    rows, cols = shape
+    xmin, xmax, ymin, ymax = extent
+    X = (T[...,0] - xmin) * (cols/(xmax-xmin)) - 0.5
+    Y = (T[...,1] - ymin) * (rows/(ymax-ymin)) - 0.5
+    area = ((X[:,1]-X[:,0])*(Y[:,2]-Y[:,0]) -
+            (X[:,2]-X[:,0])*(Y[:,1]-Y[:,0]))
+    with np.errstate(divide="ignore"):
+        inverse = np.where(area != 0, 1/area, 0)
+
+    for face, i, j in cells(bbox(T, shape, extent), chunk):
+        x, y = X[face], Y[face]
+        # Barycentric coordinates (from edge functions)
+        l0 = (x[:,1]-i)*(y[:,2]-j) - (x[:,2]-i)*(y[:,1]-j)
+        l1 = (x[:,2]-i)*(y[:,0]-j) - (x[:,0]-i)*(y[:,2]-j)
+        l0 *= inverse[face]
+        l1 *= inverse[face]
+        l2 = 1 - l0 - l1
+        inside = (l0 >= 0) & (l1 >= 0) & (l2 >= 0) & (inverse[face] != 0)
+        face, l0, l1, l2 = face[inside], l0[inside], l1[inside], l2[inside]
+        Z = T[face,:,2]
+        depth = l0*Z[:,0] + l1*Z[:,1] + l2*Z[:,2]
+        yield face, j[inside]*cols + i[inside], depth
+
+
+def zbuffer(T, shape, extent, chunk=2**22):
+    """
+    Rasterize triangles using a z-buffer (smallest z wins)
+
+    Returns
+    -------
+    depth (rows,cols) array (inf where empty) and index (rows,cols) of the
+    visible face for each cell (-1 where empty)
+    """
+
+    depth = np.full(shape[0]*shape[1], np.inf)
+    index = np.full(shape[0]*shape[1], -1)
+    for face, cell, Z in fragments(T, shape, extent, chunk):
+        np.minimum.at(depth, cell, Z)
+        front = Z <= depth[cell]
+        index[cell[front]] = face[front]
+    return depth.reshape(shape), index.reshape(shape)
+
+
+def occluded(T, shape, extent, chunk=2**22):
+    """
+    Find triangles that are hidden by nearer triangles (smaller z).
+
+    Triangles are first rasterized in a coarse depth buffer where each cell
+    covered by a triangle (at its center) receives the farthest depth of the
+    triangle. A triangle is then considered occluded if its nearest depth is
+    behind the buffer over all the cells of its (dilated) bounding box.
+
+    Returns
+    -------
+    (m,) boolean array of occluded triangles
+    """
+
+    m = len(T)
+    Zmin, Zmax = T[:,:,2].min(axis=-1), T[:,:,2].max(axis=-1)
+    buffer = np.full(shape[0]*shape[1], np.inf)
+    for face, cell, _ in fragments(T, shape, extent, chunk):
+        np.minimum.at(buffer, cell, Zmax[face])
+
+    # Farthest buffer depth over the (dilated) bounding box of each triangle
+    # (triangles outside of the grid are not considered occluded)
+    box = bbox(T, shape, extent, dilate=1)
+    farthest = np.full(m, -np.inf)
+    for face, i, j in cells(box, chunk):
+        np.maximum.at(farthest, face, buffer[j*shape[1] + i])
+    outside = (box[1] < box[0]) | (box[3] < box[2])
+    return (Zmin > farthest) & ~outside
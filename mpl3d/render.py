@@ -0,0 +1,123 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# Offline rendering of frames (turntables, animations) in a pool of processes.
+# Each process builds the scene once (using a scene factory) and renders its
+# share of the frames, either as numbered PNG files (written by the processes)
+# or as raw images that are piped (in order) to a video encoder (ffmpeg).
+# -----------------------------------------------------------------------------
+import subprocess
+import multiprocessing
+import matplotlib as mpl
+from mpl3d.camera import Camera
+
+# Scene of the current (worker) process
+_scene = None
+
+
+def turntable(count, theta=0, phi=0):
+    """
+    Camera angles (theta, phi) of a full turn around z in count frames.
+    """
+
+    return [(theta + 360*i/count, phi) for i in range(count)]
+
+
+def _initialize(scene, backend):
+    """ Build the scene of a worker process """
+
+    global _scene
+    import matplotlib.pyplot as plt
+    plt.switch_backend(backend)
+    _scene = scene()
+
+
+def _render(args):
+    """
+    Render one frame in a worker process, returning nothing if the frame has
+    been saved or (width, height, rgba buffer) otherwise.
+    """
+
+    index, params, filename = args
+    figure, update = _scene
+    update(Camera(**params).transform)
+    if filename is not None:
+        figure.savefig(filename % index)
+        return None
+    figure.canvas.draw()
+    width, height = figure.canvas.get_width_height(physical=True)
+    return width, height, bytes(figure.canvas.buffer_rgba())
+
+
+def _encoder(output, width, height, fps):
+    """ Video encoder (ffmpeg) reading raw rgba frames on its input """
+
+    command = [mpl.rcParams["animation.ffmpeg_path"], "-y",
+               "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+               "-s", "%dx%d" % (width, height), "-r", str(fps), "-i", "-",
+               "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+               "-pix_fmt", "yuv420p", output]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+def render(scene, frames, output="frame-%04d.png", camera=None, fps=25,
+           processes=None, backend="agg"):
+    """
+    Render frames in a pool of processes.
+
+    Parameters
+    ----------
+    scene : function
+        Function (without argument) that builds a scene and returns a figure
+        and an update function(transform). It is called once per process and
+        must be picklable (i.e. defined at the top level of a module).
+
+    frames : list
+        Camera parameters of each frame, given as (theta, phi) or as a dict
+        of Camera arguments (see turntable).
+
+    output : str
+        Filename pattern of numbered images (e.g. "frame-%04d.png") or
+        filename of a video (e.g. "movie.mp4") encoded using ffmpeg.
+
+    camera : dict
+        Default Camera arguments (e.g. mode or scale) of all frames
+
+    fps : int
+        Frames per second (video only)
+
+    processes : int
+        Number of processes (default is the number of cores)
+
+    Returns
+    -------
+    List of filenames (images) or output (video)
+    """
+
+    defaults = camera or {}
+    params = [{**defaults, **(frame if isinstance(frame, dict) else
+                              dict(zip(("theta", "phi"), frame)))}
+              for frame in frames]
+    images = "%" in output
+    tasks = [(i, p, output if images else None) for i, p in enumerate(params)]
+
+    with multiprocessing.Pool(processes, _initialize, (scene, backend)) as pool:
+        if images:
+            pool.map(_render, tasks, chunksize=1)
+            return [output % i for i in range(len(tasks))]
+
+        # Frames are received (and encoded) in order while others are rendered
+        encoder = None
+        try:
+            for width, height, data in pool.imap(_render, tasks, chunksize=1):
+                if encoder is None:
+                    encoder = _encoder(output, width, height, fps)
+                encoder.stdin.write(data)
+        finally:
+            if encoder is not None:
+                encoder.stdin.close()
+                encoder.wait()
+        if encoder is not None and encoder.returncode:
+            raise RuntimeError("Video encoding failed (%s)" % output)
+    return output
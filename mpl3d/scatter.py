@@ -0,0 +1,249 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import mpl3d.glm as glm
+from mpl3d.lod import octree
+import matplotlib as mpl
+
+
+class Scatter():
+    """
+    Scatter plot with depth cues
+
+    Points are sorted from back to front and rendered with a single
+    collection. Because we cannot z-test individual pixels, depth can be
+    suggested by fading farther points toward white (`fog`), by drawing a
+    larger and transparent `shadow` just behind each point and by drawing an
+    `outline` of the whole set of points behind all of them (as the first
+    points of the collection).
+
+    Base colors are computed once and all the arrays needed during an update
+    are allocated at creation.
+
+    For large point clouds, an octree of depth `lod` can be built at creation
+    where each cell is replaced by a single (mean) point. At each update, the
+    octree is traversed from its root: cells outside the view are culled and
+    visible cells larger than `lod_size` pixels are refined (largest first),
+    such that at most `lod_count` points are rendered (when possible).
+    """
+
+    def __init__(self, ax, transform, vertices, sizes=50,
+                 facecolors="white", edgecolors="black", linewidths=1.0,
+                 fog=0.0, shadow=None, outline=None, lod=0):
+        """
+        Parameters
+        ----------
+        vertices : ndarray (n,3)
+            Points positions
+
+        sizes : float or ndarray (n,)
+            Points sizes (area in points²)
+
+        facecolors, edgecolors :
+            Single color or one color per point
+
+        linewidths : float
+            Points edge width (0 for no edge)
+
+        fog : float
+            Amount of fading toward white of the farthest points (0 to 1)
+
+        shadow : color
+            Color of the shadow drawn behind each point (None for no shadow)
+
+        outline : color
+            Color of the outline drawn behind all points (None for no outline)
+
+        lod : int
+            Depth of the level of detail octree (0 for no level of detail)
+        """
+
+        self.vertices = np.asarray(vertices)
+        n = len(self.vertices)
+        self.sizes = np.broadcast_to(np.asarray(sizes, dtype=float), (n,))
+        self.facecolors = np.zeros((n,4))
+        self.facecolors[...] = mpl.colors.to_rgba_array(facecolors)
+        self.edgecolors = np.zeros((n,4))
+        self.edgecolors[...] = mpl.colors.to_rgba_array(edgecolors)
+        self.linewidths = linewidths
+        self.fog = fog
+        self.shadow = shadow
+        self.shadow_scale = 2.0
+        self.outline = outline
+        self.outline_width = 2.0
+
+        # Levels of detail as (vertices, sizes, facecolors, edgecolors,
+        # count, index, size) and number of children of each cell
+        self.levels = octree(self.vertices, self.sizes, self.facecolors,
+                             self.edgecolors, lod) if lod else []
+        self._children = [np.bincount(level[5], minlength=len(level[0]))
+                          for level in self.levels]
+        self.lod_size = 1.0
+        self.lod_count = 100000
+        self._n = n
+
+        # Layout of the collection: outline of all points first, then shadow
+        # and point interleaved for each point
+        o = 1 if outline is not None else 0
+        k = 2 if shadow is not None else 1
+        count = n*(o+k)
+        self._offsets = np.zeros((count,2))
+        self._sizes = np.zeros(count)
+        self._facecolors = np.zeros((count,4))
+        self._edgecolors = np.zeros((count,4))
+        self._layers = o, k
+
+        # Workspace
+        self._projected = np.zeros((n,3))
+        self._depth = np.zeros((n,1))
+
+        self.axes = ax
+        self.collection = ax.scatter([], [], clip_on=False)
+        self.update(transform)
+
+
+    def _layer(self, array, layer):
+        """ View of given array for a layer ("outline", "shadow" or "point") """
+
+        o, k = self._layers
+        n = self._n
+        array = array[:n*(o+k)]
+        if layer == "outline":
+            return array[:n]
+        pairs = array[n*o:].reshape((n,k) + array.shape[1:])
+        return pairs[:,0] if layer == "shadow" else pairs[:,k-1]
+
+
+    def _select(self, transform):
+        """
+        Select a cut of the octree (from its root): cells outside the view
+        are culled and visible cells larger than `lod_size` pixels are
+        refined, largest first, as long as there are at most `lod_count`
+        points.
+
+        Returns
+        -------
+        vertices, sizes, facecolors and edgecolors of selected points
+        """
+
+        points = (self.vertices, self.sizes, self.facecolors, self.edgecolors)
+        xmin, xmax = sorted(self.axes.get_xlim())
+        ymin, ymax = sorted(self.axes.get_ylim())
+        if not self.levels or xmax == xmin:
+            return points
+        pixels = self.axes.bbox.width / (xmax-xmin)
+        scale = np.linalg.norm(transform[0,:3])
+        depth = np.linalg.norm(transform[3,:3])
+
+        # Layers from the coarsest level to the original points, the parent
+        # of each cell (or point) being in the previous layer
+        layers = [level[:4] + (level[6],) for level in reversed(self.levels)]
+        layers.append(points + (0.0,))
+        parents = [level[5] for level in reversed(self.levels)]
+        children = self._children[::-1]
+
+        selected, count = [], 0
+        cells = np.arange(len(layers[0][0]))
+        for i, (V, S, FC, EC, size) in enumerate(layers):
+            # Cells (bounded by a sphere around their mean point) that are
+            # behind the camera or outside the axes limits are culled
+            P = V[cells] @ transform[:,:3].T + transform[:,3]
+            W = P[:,3]
+            r = size * np.sqrt(3)
+            R = r * scale
+            culled = W + r*depth <= 0
+            culled |= (W > 0) & ((P[:,0]+R < xmin*W) | (P[:,0]-R > xmax*W) |
+                                 (P[:,1]+R < ymin*W) | (P[:,1]-R > ymax*W))
+            cells, W = cells[~culled], W[~culled]
+            if i == len(layers)-1:
+                selected.append((i, cells))
+                break
+
+            # Cells larger than lod_size pixels (or crossing the camera
+            # plane) are refined, largest first, within lod_count points
+            with np.errstate(divide="ignore"):
+                pixel = np.where(W > 0, size*scale*pixels/W, np.inf)
+            refine = np.flatnonzero(pixel > self.lod_size)
+            refine = refine[np.argsort(-pixel[refine], kind="stable")]
+            extra = np.cumsum(children[i][cells[refine]] - 1)
+            refine = refine[extra <= self.lod_count - count - len(cells)]
+            keep = np.ones(len(cells), dtype=bool)
+            keep[refine] = False
+            selected.append((i, cells[keep]))
+            count += keep.sum()
+
+            mask = np.zeros(len(V), dtype=bool)
+            mask[cells[refine]] = True
+            cells = np.flatnonzero(mask[parents[i]])
+            if not len(cells):
+                break
+
+        return tuple(np.concatenate([layers[i][k][cells]
+                                     for i, cells in selected])
+                     for k in range(4))
+
+
+    def update(self, transform):
+        """
+        Update scatter according to transform (4x4 array)
+        """
+
+        V, S, FC, EC = self._select(transform)
+        n = self._n = len(V)
+
+        P = glm.transform(V, transform, out=self._projected[:n])
+        I = np.argsort(-P[:,2])
+
+        # Sorted points, sizes and colors
+        offsets = self._layer(self._offsets, "point")
+        np.take(P[:,:2], I, axis=0, out=offsets)
+        sizes = self._layer(self._sizes, "point")
+        np.take(S, I, out=sizes)
+        facecolors = self._layer(self._facecolors, "point")
+        np.take(FC, I, axis=0, out=facecolors)
+        edgecolors = self._layer(self._edgecolors, "point")
+        np.take(EC, I, axis=0, out=edgecolors)
+
+        # Fade farther points toward white
+        if self.fog > 0:
+            Z = self._depth[:n]
+            np.take(P[:,2], I, out=Z[:,0])
+            zmin, zmax = Z[-1,0], Z[0,0]
+            Z -= zmin
+            Z *= self.fog/(zmax-zmin) if zmax > zmin else 0
+            for colors in facecolors, edgecolors:
+                colors[:,:3] += Z * (1 - colors[:,:3])
+                np.minimum(colors, 1, out=colors)
+
+        # Shadows (bigger, transparent and without edge)
+        if self.shadow is not None:
+            self._layer(self._offsets, "shadow")[...] = offsets
+            self._layer(self._sizes, "shadow")[...] = self.shadow_scale*sizes
+            self._layer(self._facecolors, "shadow")[...] = \
+                mpl.colors.to_rgba(self.shadow)
+            self._layer(self._edgecolors, "shadow")[...] = 0
+
+        # Outline of all points. A single linewidth is used for the whole
+        # collection (per point linewidths are very slow to set), such that
+        # the outline width is obtained by enlarging the outline markers.
+        if self.outline is not None:
+            self._layer(self._offsets, "outline")[...] = offsets
+            outline = self._layer(self._sizes, "outline")
+            np.sqrt(sizes, out=outline)
+            outline += self.outline_width - self.linewidths
+            np.square(outline, out=outline)
+            self._layer(self._facecolors, "outline")[...] = \
+                mpl.colors.to_rgba(self.outline)
+            self._layer(self._edgecolors, "outline")[...] = \
+                mpl.colors.to_rgba(self.outline)
+
+        o, k = self._layers
+        count = n*(o+k)
+        self.collection.set_offsets(self._offsets[:count])
+        self.collection.set_sizes(self._sizes[:count])
+        self.collection.set_facecolors(self._facecolors[:count])
+        self.collection.set_edgecolors(self._edgecolors[:count])
+        self.collection.set_linewidths(self.linewidths)
+        self.collection.set_antialiased(self.linewidths > 0)
@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import mpl3d.glm as glm
+import matplotlib as mpl
+from mpl3d.mesh import Mesh
+
+
+class Scene():
+    """
+    Collection of meshes rendered as a single mesh
+
+    Registered meshes are concatenated into a single set of vertices, faces
+    and colors such that they are transformed in a single pass and that all
+    their faces are sorted together (and hence correctly interleaved) into a
+    single collection. Concatenation only happens when the membership of the
+    scene changes, i.e. at the first update following an add or a remove.
+    """
+
+    def __init__(self, ax, transform, **kwargs):
+        """
+        Parameters
+        ----------
+        ax : Axes
+            Axes where to render the scene
+
+        transform : ndarray (4,4)
+            Initial (view) transform
+
+        kwargs :
+            Extra parameters of the underlying mesh (see Mesh)
+        """
+
+        self.axes = ax
+        self.transform = transform
+        self.kwargs = kwargs
+        self.items = {}
+        self.mesh = None
+        self._count = 0
+        self._dirty = False
+
+
+    def add(self, vertices, faces, model=None,
+            facecolors="white", edgecolors="black"):
+        """
+        Add a mesh to the scene.
+
+        Parameters
+        ----------
+        vertices : ndarray (n,3)
+            Mesh vertices
+
+        faces : ndarray (m,k)
+            Mesh faces (with the same number k of vertices for all meshes)
+
+        model : ndarray (4,4)
+            Model matrix applied once to vertices
+
+        facecolors, edgecolors :
+            Single color or one color per face
+
+        Returns
+        -------
+        key of the mesh in the scene (see remove)
+        """
+
+        vertices = np.asarray(vertices, dtype=float)
+        faces = np.asarray(faces)
+        if model is not None:
+            vertices = glm.transform(vertices, model)
+        m = len(faces)
+        facecolors = mpl.colors.to_rgba_array(facecolors)
+        edgecolors = mpl.colors.to_rgba_array(edgecolors)
+        facecolors = np.broadcast_to(facecolors, (m,4))
+        edgecolors = np.broadcast_to(edgecolors, (m,4))
+
+        key = self._count
+        self._count += 1
+        self.items[key] = vertices, faces, facecolors, edgecolors
+        self._dirty = True
+        return key
+
+
+    def remove(self, key):
+        """ Remove the mesh with given key from the scene. """
+
+        del self.items[key]
+        self._dirty = True
+
+
+    def _build(self):
+        """ Concatenate all meshes into a single one """
+
+        if self.mesh is not None:
+            if self.mesh.backend == "raster":
+                self.mesh.image.remove()
+            else:
+                self.mesh.collection.remove()
+            self.mesh = None
+        self._dirty = False
+        if not self.items:
+            return
+
+        V, F, FC, EC = zip(*self.items.values())
+        offset = np.cumsum([0] + [len(v) for v in V[:-1]])
+        vertices = np.concatenate(V)
+        faces = np.concatenate([f + o for f, o in zip(F, offset)])
+        self.mesh = Mesh(self.axes, self.transform, vertices, faces,
+                         facecolors=np.concatenate(FC),
+                         edgecolors=np.concatenate(EC), **self.kwargs)
+
+
+    def update(self, transform):
+        """
+        Update the scene, rebuilding it if its membership has changed.
+
+        Parameters
+        ----------
+        transform : ndarray (4,4)
+            View transform
+        """
+
+        self.transform = transform
+        if self._dirty:
+            self._build()
+        elif self.mesh is not None:
+            self.mesh.update(transform)
+
+
+    def interact(self, state):
+        """ Set interactive state of the scene (see Mesh.interact) """
+
+        if self.mesh is not None:
+            self.mesh.interact(state)
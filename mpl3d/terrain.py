@@ -0,0 +1,269 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import mpl3d.glm as glm
+import mpl3d.lighting as lighting
+import matplotlib as mpl
+from collections import OrderedDict
+from matplotlib.collections import PolyCollection
+from mpl3d.heightfield import eye, project, order, normals
+
+
+class Terrain():
+    """
+    Terrain streamed from a (memory-mapped) elevation grid
+
+    The grid is never loaded as a whole. It is split into the tiles of a
+    quadtree: the root tile covers the whole grid and each tile is split
+    into four tiles with twice the resolution, such that all tiles have
+    about `tile` cells per side and leaves have the resolution of the grid.
+
+    At each update, the quadtree is traversed (from back to front) and only
+    visible tiles are refined until their cells are smaller than `lod_size`
+    pixels. Tiles (heights, colors and normals) are read from the grid when
+    they are needed and kept in a cache of at most `cache` tiles, the least
+    recently used tiles being evicted first.
+
+    Each tile is rendered as a height field (see HeightField) surrounded by
+    a skirt (of `skirt` color) that hides cracks between tiles of different
+    resolutions and closes the terrain on its borders.
+    """
+
+    def __init__(self, ax, transform, Z, extent=(-0.5, 0.5, -0.5, 0.5),
+                 height=0.25, zlim=None, nodata=None, cmap=None, tile=64,
+                 lights=None):
+        """
+        Parameters
+        ----------
+        Z : str or ndarray (ny,nx)
+            Elevation grid or filename of an elevation grid (.npy) that is
+            memory-mapped
+
+        extent : (float, float, float, float)
+            Extent (xmin, xmax, ymin, ymax) of the grid
+
+        height : float
+            Height of the terrain, elevations in zlim being mapped to
+            [0, height]
+
+        zlim : (float, float)
+            Elevation range (estimated from the root tile if not given)
+
+        nodata : float
+            Elevation of missing data (replaced by the lowest elevation)
+
+        cmap : Colormap
+            Colormap used for (normalized) elevations
+        """
+
+        if isinstance(Z, str):
+            Z = np.load(Z, mmap_mode="r")
+        self.data = Z
+        self.extent = extent
+        self.height = height
+        self.nodata = nodata
+        self.cmap = cmap if cmap is not None else mpl.colormaps["viridis"]
+        self.tile = tile
+        self.lod_size = 4.0
+        self.skirt = (0.75, 0.75, 0.75, 1.0)
+        self.lights = lights
+        self.ambient = 0.2
+        self.diffuse = 0.8
+        self.specular = 0.5
+        self.shininess = 32
+        self.axes = ax
+
+        # Depth of the quadtree (leaves are at full resolution)
+        ny, nx = Z.shape
+        self.depth = max(int(np.ceil(np.log2(max(ny-1, nx-1) / tile))), 0)
+
+        # Tiles cache
+        self.cache = 256
+        self.tiles = OrderedDict()
+
+        if zlim is None:
+            _, _, R, C = self._bounds((0, 0, 0))
+            Z = np.asarray(self.data[np.ix_(R, C)], dtype=float)
+            if nodata is not None:
+                Z = Z[Z != nodata]
+            zlim = Z.min(), Z.max()
+        self.zlim = zlim
+
+        self.collection = PolyCollection([], clip_on=False, snap=False)
+        self.update(transform)
+        ax.add_collection(self.collection, autolim=False)
+
+
+    def _bounds(self, key):
+        """
+        Rows and columns (first, last and indices) of the grid points of a
+        tile (given as depth and row/column in the quadtree)
+        """
+
+        depth, i, j = key
+        ny, nx = self.data.shape
+        stride = 2**(self.depth - depth)
+        span = self.tile * stride
+        r0, r1 = i*span, min((i+1)*span, ny-1)
+        c0, c1 = j*span, min((j+1)*span, nx-1)
+        R = np.append(np.arange(r0, r1, stride), r1)
+        C = np.append(np.arange(c0, c1, stride), c1)
+        return (r0, r1), (c0, c1), R, C
+
+
+    def _coordinates(self, rows, cols):
+        """ Object coordinates of grid rows and columns """
+
+        ny, nx = self.data.shape
+        xmin, xmax, ymin, ymax = self.extent
+        x = xmin + np.asarray(cols) * (xmax-xmin)/(nx-1)
+        y = ymin + np.asarray(rows) * (ymax-ymin)/(ny-1)
+        return x, y
+
+
+    def _load(self, key):
+        """ Read a tile from the grid """
+
+        _, _, R, C = self._bounds(key)
+        Z = np.array(self.data[np.ix_(R, C)], dtype=float)
+        zmin, zmax = self.zlim
+        if self.nodata is not None:
+            Z[Z == self.nodata] = zmin
+        Z = ((Z - zmin) / (zmax - zmin)).clip(0, 1)
+
+        # Colors of cells (from mean elevation)
+        colors = self.cmap((Z[:-1,:-1] + Z[:-1,1:] + Z[1:,:-1] + Z[1:,1:])/4)
+        Z *= self.height
+        x, y = self._coordinates(R, C)
+        return x, y, Z, colors.reshape(-1,4), normals(x, y, Z)
+
+
+    def _tile(self, key):
+        """ Get a tile from the cache (loading it if necessary) """
+
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+        else:
+            self.tiles[key] = self._load(key)
+            while len(self.tiles) > self.cache:
+                self.tiles.popitem(last=False)
+        return self.tiles[key]
+
+
+    def _select(self, transform, E, key=(0, 0, 0), tiles=None):
+        """
+        Visible tiles at the required resolution, from back to front
+        """
+
+        tiles = [] if tiles is None else tiles
+        depth, i, j = key
+        (r0, r1), (c0, c1), _, _ = self._bounds(key)
+        (x0, x1), (y0, y1) = self._coordinates([r0, r1], [c0, c1])
+
+        # Bounding box of the tile in clip space, that is not visible if its
+        # corners are all behind the camera or outside the same axes limit
+        B = np.array([[x, y, z, 1] for x in (x0, x1) for y in (y0, y1)
+                                   for z in (0, self.height)])
+        B = B @ transform.T
+        W = B[:,3]
+        xmin, xmax = sorted(self.axes.get_xlim())
+        ymin, ymax = sorted(self.axes.get_ylim())
+        if ((W <= 0).all() or (B[:,0] < xmin*W).all() or
+            (B[:,0] > xmax*W).all() or (B[:,1] < ymin*W).all() or
+            (B[:,1] > ymax*W).all()):
+            return tiles
+
+        # Size of cells in pixels (at the nearest corner), tiles crossing the
+        # camera plane being refined up to the full resolution
+        refine = depth < self.depth
+        if refine and (W > 0).all():
+            pixels = self.axes.bbox.width / (xmax-xmin)
+            size = (self.extent[1]-self.extent[0]) / (self.data.shape[1]-1)
+            size *= 2**(self.depth - depth)
+            scale = np.linalg.norm(transform[0,:3]) / W.min() * pixels
+            refine = size*scale > self.lod_size
+        if not refine:
+            tiles.append((key, (W <= 0).any()))
+            return tiles
+
+        # Children from back to front
+        ny, nx = self.data.shape
+        span = self.tile * 2**(self.depth - depth - 1)
+        xm, ym = self._coordinates(r0 + span, c0 + span)
+        ex, ey = (E[0], E[1]) if E[3] == 0 else (E[0]-xm, E[1]-ym)
+        rows = [0, 1] if ey > 0 else [1, 0]
+        cols = [0, 1] if ex > 0 else [1, 0]
+        for di in rows:
+            for dj in cols:
+                child = depth+1, 2*i+di, 2*j+dj
+                if child[1]*span < ny-1 and child[2]*span < nx-1:
+                    self._select(transform, E, child, tiles)
+        return tiles
+
+
+    def _skirt(self, transform, E, x, y, Z):
+        """
+        Skirt polygons of a tile (from back to front), as vertical walls
+        going from the borders of the tile down to zero.
+        """
+
+        walls = []
+        for axis, index, position in ((0, 0, x[0]), (0, -1, x[-1]),
+                                      (1, 0, y[0]), (1, -1, y[-1])):
+            if axis == 0:
+                border = np.c_[np.full(len(y), x[index]), y, Z[:,index]]
+            else:
+                border = np.c_[x, np.full(len(x), y[index]), Z[index,:]]
+            base = border.copy()
+            base[:,2] = 0
+            P = glm.transform(np.concatenate([border, base]), transform)
+            P = P[:,:2].reshape(2,-1,2)
+            V = np.stack([P[0,:-1], P[0,1:], P[1,1:], P[1,:-1]], axis=1)
+
+            # Walls on the camera side are in front of the other ones
+            e = E[axis] if E[3] == 0 else E[axis] - position
+            near = e < 0 if index == 0 else e > 0
+            walls.insert(len(walls) if near else 0, V)
+        return np.concatenate(walls)
+
+
+    def update(self, transform):
+        """ Update terrain according to transform (4x4 array) """
+
+        E = eye(transform)
+        polygons, colors = [], []
+        for key, crossing in self._select(transform, E):
+            x, y, Z, facecolors, N = self._tile(key)
+            if self.skirt is not None and not crossing:
+                S = self._skirt(transform, E, x, y, Z)
+                polygons.append(S)
+                colors.append(np.tile(self.skirt, (len(S),1)))
+
+            P = project(transform, x, y, Z)
+            I = order(E, x, y)
+            corners = np.array([0, 1, len(x)+1, len(x)])
+            if crossing:
+                # Cells with a corner behind the camera are not rendered
+                M = transform
+                W = M[3,2]*Z + (M[3,0]*x + M[3,1]*y.reshape(-1,1) + M[3,3])
+                I = I[(W.ravel() > 0)[I.reshape(-1,1) + corners].all(axis=1)]
+            J = I - I//len(x)
+            polygons.append(P[I.reshape(-1,1) + corners])
+            facecolors = facecolors[J]
+            if self.lights:
+                N = lighting.camera_normals(N[J], transform)
+                facecolors = lighting.shade(N, facecolors, self.lights,
+                                            self.ambient, self.diffuse,
+                                            self.specular, self.shininess)
+            colors.append(facecolors)
+
+        if polygons:
+            self.collection.set_verts(np.concatenate(polygons))
+            self.collection.set_facecolors(np.concatenate(colors))
+        else:
+            self.collection.set_verts([])
+        self.collection.set_edgecolors("none")
+        self.collection.set_linewidths(0)
+        self.collection.set_antialiased(False)
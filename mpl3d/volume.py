@@ -0,0 +1,252 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import matplotlib as mpl
+from matplotlib.image import AxesImage
+
+
+def _reduce(A, func, size):
+    """
+    Reduce A over blocks of size³ cells (i.e. (size+1)³ points, blocks
+    sharing their boundary points).
+    """
+
+    for axis in range(3):
+        A = np.moveaxis(A, axis, 0)
+        n = len(A)
+        m = max(-(-(n-1) // size), 1)
+
+        # Last block is completed by repeating the last points
+        if m*size + 1 > n:
+            A = np.concatenate([A, np.repeat(A[-1:], m*size + 1 - n, axis=0)])
+        R = func.reduce(A[:m*size].reshape((m, size) + A.shape[1:]), axis=1)
+        A = np.moveaxis(func(R, A[size::size][:m]), 0, axis)
+    return A
+
+
+def bricks(data, size=16):
+    """
+    Min/max index of a scalar field over bricks of size³ cells.
+
+    Parameters
+    ----------
+    data : ndarray (nx,ny,nz)
+        Scalar field
+
+    size : int
+        Number of cells along each side of a brick
+
+    Returns
+    -------
+    (vmin, vmax, size) where vmin and vmax are the minimum and maximum values
+    of each brick
+    """
+
+    data = np.asarray(data)
+    return _reduce(data, np.minimum, size), _reduce(data, np.maximum, size), size
+
+
+class Volume():
+    """
+    Volume (3d scalar field) rendered using ray marching
+
+    A ray is cast for each pixel of the rendered image and marched through
+    the volume, all rays being processed at once. The volume is rendered
+    using maximum intensity projection (`mode="mip"`) or front to back alpha
+    compositing (`mode="composite"`) where the opacity of a sample of value
+    v (normalized) is `alpha * ((v-threshold)/(1-threshold))²`.
+
+    Rays are terminated as soon as they are (almost) opaque and they skip
+    empty space using a coarse grid of bricks (with the min/max value of
+    each brick) such that rendering cost depends on the number of pixels
+    more than on the number of voxels.
+    """
+
+    def __init__(self, ax, transform, data, cmap=None, mode="mip",
+                 extent=(-0.5, 0.5, -0.5, 0.5, -0.5, 0.5), alpha=0.5,
+                 threshold=0.0, scale=0.5):
+        """
+        Parameters
+        ----------
+        data : ndarray (nx,ny,nz)
+            Scalar field
+
+        cmap : Colormap
+            Colormap used to map normalized values to colors
+
+        mode : str
+            "mip" (maximum intensity projection) or "composite"
+
+        extent : (float, float, float, float, float, float)
+            Extent of the volume as (xmin, xmax, ymin, ymax, zmin, zmax)
+
+        alpha : float
+            Opacity of a sample of maximum value (composite mode)
+
+        threshold : float
+            Normalized value under which samples are transparent
+
+        scale : float
+            Resolution of the image relatively to the axes pixels
+        """
+
+        self.axes = ax
+        data = np.asarray(data, dtype=float)
+        vmin, vmax = data.min(), data.max()
+        self.data = (data - vmin) / (vmax - vmin if vmax > vmin else 1)
+        self.cmap = cmap if cmap is not None else mpl.colormaps["magma"]
+        self.mode = mode
+        self.extent = np.asarray(extent, dtype=float).reshape(3,2)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.scale = scale
+        self.step = 0.5
+        self.brick = 8
+        self.opaque = 0.99
+        self._lut = self.cmap(np.linspace(0, 1, 256))
+
+        # Coarse grid of bricks with max value of each brick (bricks overlap
+        # by one voxel for interpolation)
+        self.bricks = bricks(self.data, self.brick)[1]
+
+        self.image = AxesImage(ax, origin="lower", interpolation="bilinear")
+        self.update(transform)
+        ax.add_image(self.image)
+
+
+    def _sample(self, P):
+        """ Trilinear interpolation of data at (normalized) voxel coords P """
+
+        n = np.array(self.data.shape)
+        P = P.clip(0, n-1)
+        I = np.minimum(P.astype(int), n-2).clip(0)
+        F = P - I
+        i, j, k = I.T
+        x, y, z = F.T
+        D = self.data
+        v = 0
+        for di, wx in ((0, 1-x), (1, x)):
+            for dj, wy in ((0, 1-y), (1, y)):
+                for dk, wz in ((0, 1-z), (1, z)):
+                    v = v + wx*wy*wz*D[np.minimum(i+di, n[0]-1),
+                                       np.minimum(j+dj, n[1]-1),
+                                       np.minimum(k+dk, n[2]-1)]
+        return v
+
+
+    def _rays(self, transform):
+        """
+        Rays (origin and direction in voxel coordinates) of each pixel and
+        their entry and exit into the volume.
+        """
+
+        xmin, xmax = self.axes.get_xlim()
+        ymin, ymax = self.axes.get_ylim()
+        rows = max(int(self.axes.bbox.height * self.scale), 1)
+        cols = max(int(self.axes.bbox.width * self.scale), 1)
+        X, Y = np.meshgrid(xmin + (np.arange(cols)+0.5)*(xmax-xmin)/cols,
+                           ymin + (np.arange(rows)+0.5)*(ymax-ymin)/rows)
+
+        # Unproject near and far points of each pixel
+        inverse = np.linalg.inv(transform)
+        H = np.ones((rows*cols, 4))
+        H[:,0], H[:,1], H[:,2] = X.ravel(), Y.ravel(), -1
+        near = H @ inverse.T
+        H[:,2] = +1
+        far = H @ inverse.T
+        near = near[:,:3] / near[:,3:]
+        far = far[:,:3] / far[:,3:]
+
+        # Voxel coordinates (voxel centers at integer coordinates)
+        n = np.array(self.data.shape)
+        lo, hi = self.extent[:,0], self.extent[:,1]
+        O = (near - lo) / (hi - lo) * n - 0.5
+        D = (far - lo) / (hi - lo) * n - 0.5 - O
+        D /= np.linalg.norm(D, axis=1).reshape(-1,1)
+
+        # Entry and exit of rays (slab method)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            T0 = (-0.5 - O) / D
+            T1 = (n - 0.5 - O) / D
+        T0, T1 = np.fmin(T0, T1), np.fmax(T0, T1)
+        t0 = np.maximum(np.nanmax(T0, axis=1), 0)
+        t1 = np.nanmin(T1, axis=1)
+        return (rows, cols), O, D, t0, t1
+
+
+    def update(self, transform):
+        """
+        Update volume according to transform (4x4 array)
+        """
+
+        shape, O, D, t0, t1 = self._rays(transform)
+        m = len(O)
+        composite = self.mode == "composite"
+        C = np.zeros((m,3))                 # Accumulated color
+        A = np.zeros(m)                     # Accumulated alpha (or max value)
+        B = self.brick
+        n = np.array(self.data.shape)
+        threshold = self.threshold
+
+        active = np.flatnonzero(t1 > t0)
+        t = t0[active]
+        while len(active):
+            o, d = O[active], D[active]
+            P = o + t.reshape(-1,1)*d
+
+            # Empty space skipping: advance rays to the exit of bricks whose
+            # values cannot contribute
+            b = (P.clip(0, n-1) // B).astype(int)
+            b = np.minimum(b, np.array(self.bricks.shape) - 1)
+            bmax = self.bricks[b[:,0], b[:,1], b[:,2]]
+            if composite:
+                skip = bmax <= threshold
+            else:
+                skip = bmax <= np.maximum(A[active], threshold)
+            if skip.any():
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    side = np.where(d[skip] > 0, b[skip]*B + B, b[skip]*B)
+                    T = (side - o[skip]) / d[skip]
+                T = np.nanmin(np.where(T > t[skip,None], T, np.inf), axis=1)
+                # (keeping samples at the same positions along rays)
+                start = t0[active[skip]]
+                T = np.maximum(T, t[skip])
+                t[skip] = start + np.floor((T - start)/self.step + 1)*self.step
+
+            # Sampling (of non skipped rays)
+            keep = ~skip
+            if keep.any():
+                v = self._sample(P[keep])
+                k = active[keep]
+                if composite:
+                    a = ((v - threshold) / (1 - threshold)).clip(0, 1)
+                    a = 1 - (1 - self.alpha*a*a)**self.step
+                    color = self._lut[(v*255).astype(int).clip(0,255), :3]
+                    w = (1 - A[k]) * a
+                    C[k] += w.reshape(-1,1) * color
+                    A[k] += w
+                else:
+                    A[k] = np.maximum(A[k], v)
+                t[keep] += self.step
+
+            # Ray termination (exit or opaque)
+            done = t >= t1[active]
+            if composite:
+                done |= A[active] >= self.opaque
+            active, t = active[~done], t[~done]
+
+        # Final image
+        image = np.zeros((m,4))
+        if composite:
+            visible = A > 0
+            image[visible,:3] = C[visible] / A[visible].reshape(-1,1)
+            image[:,3] = A
+        else:
+            visible = (t1 > t0) & (A > threshold)
+            image[visible] = self._lut[(A[visible]*255).astype(int)]
+        self.image.set_data(image.reshape(shape[0], shape[1], 4))
+        xmin, xmax = self.axes.get_xlim()
+        ymin, ymax = self.axes.get_ylim()
+        self.image.set_extent((xmin, xmax, ymin, ymax))
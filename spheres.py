@@ -6,7 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from mpl3d import glm
-from mpl3d.mesh import Mesh
+from mpl3d.scene import Scene
 
 
 def sphere(radius=1.0, slices=32, stacks=32):
@@ -77,7 +77,8 @@ if __name__ == "__main__":
     ambient_color = np.array([1,0,0])
     diffuse_color = np.array([1,.25,.25])
     specular_color = np.array([1,1,1])
-    
+
+    scene = Scene(ax, camera, linewidths=0)
     for x, d in zip(np.linspace(-0.75, 0.75, 4), [0.00, 0.25, 0.50, 0.75]):
         diffuse_strength = d
         ambient_strength = 1-d
@@ -86,8 +87,8 @@ if __name__ == "__main__":
                                   ambient_color, ambient_strength,
                                   diffuse_color, diffuse_strength,
                                   specular_color, shininess)
-            mesh = Mesh(ax, camera @ glm.translate(x,y,0.0),
-                        vertices, faces, facecolors=facecolors, linewidths=0)
+            scene.add(vertices, faces, glm.translate(x,y,0.0), facecolors)
+    scene.update(camera)
 
     plt.savefig("spheres.png", dpi=600)
     plt.show()
@@ -0,0 +1,31 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import matplotlib
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+from mpl3d.bar import Bar
+from mpl3d.camera import Camera
+
+
+def test_hidden_faces():
+    """ Adjacent bars touch and hide side faces of bars as tall or lower """
+
+    fig = plt.figure(figsize=(4,4))
+    ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
+    Z = np.array([[0.1, 0.2, 0.3],
+                  [0.2, 0.2, 0.1]])
+    bars = Bar(ax, Camera("perspective", 65, -125).transform, Z)
+
+    # Facing sides of adjacent bars are in the same plane
+    planes = bars.planes.reshape(2,3,6)
+    assert np.allclose(planes[:,:-1,1], planes[:,1:,2])
+    assert np.allclose(planes[:-1,:,4], planes[1:,:,3])
+    hidden = bars.hidden.reshape(2,3,6)
+    assert hidden[0,:2,1].all() and not hidden[0,1:,2].any()
+    assert hidden[1,1,2] and hidden[1,0,1] and not hidden[1,1,1]
+    assert hidden[0,1,4] and hidden[1,1,3]
+    assert len(bars.collection.get_paths()) <= 3*Z.size
+    plt.close(fig)
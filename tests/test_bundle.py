@@ -0,0 +1,50 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import os
+import numpy as np
+import matplotlib
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+from mpl3d import glm
+from mpl3d import bundle
+from mpl3d.io import read_obj
+from mpl3d.mesh import Mesh
+from mpl3d.camera import Camera
+
+source = os.path.join(os.path.dirname(__file__), "..", "data", "bunny.obj")
+
+
+def build(lod):
+    vertices, faces = read_obj(source)
+    return bundle.mesh(glm.fit_unit_cube(vertices), faces, lod=lod)
+
+
+def test_bundle_levels(tmp_path):
+    """ A mesh renders the (memory-mapped) levels of detail of a bundle """
+
+    data = bundle.cache(str(tmp_path / "bunny.bundle"), [source], build, lod=3)
+    assert len(data["levels"]) == 3
+
+    fig = plt.figure(figsize=(4,4))
+    ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
+    camera = Camera("ortho", scale=2)
+    facecolors = np.random.uniform(0, 1, (len(data["faces"]), 4))
+    mesh = Mesh(ax, camera.transform, data["vertices"], data["faces"],
+                facecolors=facecolors, normals=data["normals"],
+                lod=data["levels"])
+
+    # Coarsest level
+    mesh.lod_size = 1000
+    mesh.update(camera.transform)
+    assert mesh.level == 3
+    assert len(mesh.collection.get_paths()) <= len(data["levels"][-1][1])
+
+    # Level of detail proxy while dragging
+    mesh.lod_size = 1
+    mesh.interact(True)
+    mesh.update(camera.transform)
+    mesh.interact(False)
+    fig.canvas.draw()
+    plt.close(fig)
@@ -0,0 +1,120 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import io
+import tracemalloc
+import numpy as np
+import matplotlib
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+from mpl3d import glm
+from mpl3d.mesh import Mesh, InstancedMesh
+from mpl3d.camera import Camera
+
+
+def sphere(slices=64, stacks=64):
+    """ UV sphere (vertices and triangular faces) """
+
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, stacks+1),
+                             np.linspace(0, 2*np.pi, slices+1), indexing="ij")
+    vertices = np.stack([np.sin(theta)*np.cos(phi), np.sin(theta)*np.sin(phi),
+                         np.cos(theta)], -1).reshape(-1,3) / 2
+    I = np.arange((stacks+1)*(slices+1)).reshape(stacks+1, slices+1)
+    A, B = I[:-1,:-1].ravel(), I[:-1,1:].ravel()
+    C, D = I[1:,1:].ravel(), I[1:,:-1].ravel()
+    faces = np.concatenate([np.stack([A, B, C], -1), np.stack([A, C, D], -1)])
+    return vertices, faces
+
+
+def axes():
+    fig = plt.figure(figsize=(4,4))
+    ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
+    return fig, ax
+
+
+def test_update_memory_is_flat():
+    """ Updates reuse the workspace instead of allocating per face arrays """
+
+    fig, ax = axes()
+    vertices, faces = sphere()
+    facecolors = np.random.uniform(0, 1, (len(faces), 4))
+    mesh = Mesh(ax, Camera("perspective").transform, vertices, faces,
+                facecolors=facecolors)
+    transforms = [Camera("perspective", theta, 20).transform
+                  for theta in range(0, 360, 6)]
+
+    # Collection setters copy their input (this is matplotlib memory)
+    for name in "set_verts", "set_facecolors", "set_edgecolors":
+        setattr(mesh.collection, name, lambda *args, **kwargs: None)
+
+    # A first turn allocates the workspace
+    for transform in transforms:
+        mesh.update(transform)
+
+    tracemalloc.start()
+    try:
+        peaks, sizes = [], []
+        for transform in transforms:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            mesh.update(transform)
+            size, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - start)
+            sizes.append(size)
+    finally:
+        tracemalloc.stop()
+    plt.close(fig)
+
+    # Peak memory of an update stays far below the size of the transformed
+    # faces (m,3,3) and nothing accumulates (the first traced update
+    # replaces arrays that were allocated before tracing started)
+    assert max(peaks) < len(faces)*3*3*8 / 3
+    assert sizes[-1] - sizes[0] < 64*1024
+
+
+def test_integer_colors():
+    """ Integer RGBA face and edge colors (one per face) are accepted """
+
+    fig, ax = axes()
+    vertices, faces = sphere(8, 8)
+    colors = np.zeros((len(faces), 4), dtype=int)
+    colors[:,3] = 1
+    mesh = Mesh(ax, Camera("ortho").transform, vertices, faces,
+                facecolors=colors, edgecolors=colors)
+    mesh.update(Camera("ortho", 30, 30).transform)
+    assert len(mesh.collection.get_facecolors()) > 0
+    plt.close(fig)
+
+
+def test_raster_resolution():
+    """ Raster backend follows the resolution of the renderer """
+
+    fig, ax = axes()
+    vertices, faces = sphere(16, 16)
+    mesh = Mesh(ax, Camera("ortho").transform, vertices, faces,
+                backend="raster")
+    fig.canvas.draw()
+    assert mesh.image.get_array().shape[:2] == (400, 400)
+
+    fig.savefig(io.BytesIO(), dpi=200)
+    assert mesh.image.get_array().shape[:2] == (800, 800)
+    plt.close(fig)
+
+
+def test_instanced_normals():
+    """ Normals of (non uniformly) scaled instances are orthogonal to faces """
+
+    fig, ax = axes()
+    vertices, faces = sphere(8, 8)
+    mesh = InstancedMesh(ax, Camera("ortho").transform, vertices, faces,
+                         offsets=[[0,0,0], [1,0,0]],
+                         scales=[[1,1,0.1], [2,1,3]])
+    J = np.arange(len(mesh))
+    normals = mesh._facenormals(J, J).reshape(2, len(faces), 3)
+    for model, N in zip(mesh.models, normals):
+        T = (vertices @ model[:3,:3].T)[faces]
+        C = np.cross(T[:,1]-T[:,0], T[:,2]-T[:,0])
+        valid = np.linalg.norm(C, axis=1) > 1e-12
+        assert np.allclose((glm.normalize(C[valid]) * N[valid]).sum(1), 1)
+    plt.close(fig)
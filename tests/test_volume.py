@@ -0,0 +1,30 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+import numpy as np
+import matplotlib
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+from mpl3d.camera import Camera
+from mpl3d.volume import Volume
+
+
+def test_empty_space_skipping():
+    """ Empty space skipping does not change the rendered image """
+
+    X, Y, Z = np.mgrid[-1:1:40j, -1:1:40j, -1:1:40j]
+    data = np.exp(-((X-0.2)**2 + (Y+0.1)**2 + Z**2) / 0.05)
+    camera = Camera("perspective", 200, -30)
+    for mode, threshold in ("mip", 0.0), ("composite", 0.1):
+        fig = plt.figure(figsize=(3,3))
+        ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
+        volume = Volume(ax, camera.transform, data, mode=mode,
+                        threshold=threshold)
+        image = volume.image.get_array().copy()
+
+        # No brick can be skipped
+        volume.bricks[...] = 1e9
+        volume.update(camera.transform)
+        assert np.allclose(image, volume.image.get_array())
+        plt.close(fig)
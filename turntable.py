@@ -0,0 +1,42 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
+# Distributed under the (new) BSD License.
+# -----------------------------------------------------------------------------
+# This example shows how to render a turntable movie using all cores
+# -----------------------------------------------------------------------------
+import os
+import matplotlib.pyplot as plt
+from mpl3d import glm
+from mpl3d import bundle
+from mpl3d.mesh import Mesh
+from mpl3d.camera import Camera
+from mpl3d.render import render, turntable
+from mpl3d.io import read_obj
+
+
+def build():
+    vertices, faces = read_obj("data/bunny.obj")
+    return bundle.mesh(glm.fit_unit_cube(vertices), faces)
+
+
+def scene():
+    fig = plt.figure(figsize=(4,4))
+    ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
+    ax.axis("off")
+    data = bundle.load("data/bunny.bundle")
+    mesh = Mesh(ax, Camera("ortho", scale=2).transform,
+                data["vertices"], data["faces"],
+                cmap=plt.get_cmap("magma"),  edgecolors=(0,0,0,0.25))
+    return fig, mesh.update
+
+
+# --- main --------------------------------------------------------------------
+if __name__ == "__main__":
+
+    # The bundle is built once before processes load it
+    bundle.cache("data/bunny.bundle", ["data/bunny.obj"], build)
+
+    os.makedirs("turntable", exist_ok=True)
+    frames = turntable(72, phi=-30)
+    render(scene, frames, "turntable/frame-%03d.png",
+           camera={"mode": "ortho", "scale": 2})
@@ -2,12 +2,12 @@
 # Copyright (c) 2020 Nicolas P. Rougier. All rights reserved.
 # Distributed under the (new) BSD License.
 # -----------------------------------------------------------------------------
-# This example shows tessagon usage (https://github.com/cwant/tessagon)
+# This example shows how to render a volume using ray marching
 # -----------------------------------------------------------------------------
 import numpy as np
-from mpl3d import glm
 from mpl3d.mesh import Mesh
 from mpl3d.camera import Camera
+from mpl3d.volume import Volume
 
 cube = {
     "vertices":  [ [+1,+1,+1],  # A
@@ -26,63 +26,26 @@ cube = {
                  [4, 7, 6, 5] ]  # EFGH: bottom face
 }
 
-class Scatter:
-    def __init__(self, ax, transform, vertices, sizes, facecolors):
-        self.vertices = vertices
-        self.facecolors = facecolors
-        self.sizes = sizes
-        self.scatter = ax.scatter([], [], clip_on=False)
-        self.update(transform)
-        
-    def update(self, transform):
-        vertices = glm.transform(self.vertices, transform)
-        I = np.argsort(-vertices[:,2])
-        vertices = vertices[I]
-        facecolors = self.facecolors[I]
-        sizes = self.sizes[I]
-        self.scatter.set_offsets(vertices[:,:2])
-        self.scatter.set_facecolors(facecolors)
-        self.scatter.set_sizes(sizes)
-        self.scatter.set_antialiaseds(False)
-        self.scatter.set_edgecolors("None")
-
-
 # --- main --------------------------------------------------------------------
 if __name__ == "__main__":
-    import numpy as np
-    import matplotlib as mpl
     import matplotlib.pyplot as plt
 
     X, Y, Z = np.mgrid[-8:8:50j, -8:8:50j, -8:8:50j]
     V = np.sin(X*Y*Z) / (X*Y*Z)
-    vertices = np.zeros((X.size,3))
-    vertices[:,0] = X.ravel()/16
-    vertices[:,1] = Y.ravel()/16
-    vertices[:,2] = Z.ravel()/16
-    # Add some jitter to positions
-    vertices += 0.003*np.random.normal(0,1,vertices.shape)
-
-    V = V.ravel()
-    V = (V-V.min())/(V.max()-V.min())
-    
-    cmap = plt.get_cmap("magma")
-    norm = mpl.colors.Normalize(vmin=0,vmax=1)
-    facecolors = cmap(norm(V))
-    facecolors[:,3] = 0.5*V*V
-    sizes = 25 + 50*V
 
     fig = plt.figure(figsize=(6,6))
     ax = fig.add_axes([0,0,1,1], xlim=[-1,+1], ylim=[-1,+1], aspect=1)
     ax.axis("off")
 
     camera = Camera("perspective", 45, 35)
-    scatter = Scatter(ax, camera.transform, vertices, sizes, facecolors)
+    volume = Volume(ax, camera.transform, V, cmap=plt.get_cmap("magma"),
+                    mode="composite", alpha=0.5)
     cube = Mesh(ax, camera.transform, 
                 np.array(cube["vertices"])/2,  np.array(cube["faces"]),
                 facecolors="None", edgecolors=(0,0,0,.5), mode="front")
 
     def update(transform):
-        scatter.update(transform)
+        volume.update(transform)
         cube.update(transform)
 
     camera.connect(ax, update)